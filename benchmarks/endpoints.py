@@ -0,0 +1,147 @@
+"""Time the LLM endpoints end to end against recorded Groq and Wikipedia I/O.
+
+Record fixtures once on a machine with network access, GROQ_API_KEY and Chrome:
+    python benchmarks/endpoints.py --mode record --runs 1
+
+Then replay them offline, deterministically:
+    python benchmarks/endpoints.py --runs 20 [--timing]
+
+Requests go through the full Django stack against a throwaway test database
+and media directory. Admission control, response caching and revision-aware
+proofreading are disabled so every run does the same work. The proofreader's
+spell-check dictionary is pinned to the benchmark document's own vocabulary, so
+its prompts, and therefore the recordings, do not change when the word list does.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHAT_MESSAGE = "Explain how a hash table works, with a short example."
+WIKIPEDIA_URL = "https://en.wikipedia.org/wiki/Hash_table"
+RAG_QUERY = "What does the document say about collisions?"
+
+
+def benchmark_document():
+    # Deterministic input so recorded prompts match on every run
+    paragraphs = [
+        f"Section {i}. A hash table maps keys to values using a hash function. "
+        f"When two keys hash to the same bucket, collisions are resolved by chaining or open addressing. "
+        f"Teh load factor of table {i} determines when it is resized."
+        for i in range(1, 41)
+    ]
+    return ("\n\n".join(paragraphs)).encode('utf-8')
+
+
+def benchmark_dictionary():
+    # Every word of the benchmark document, so the spell check does the same work on every machine
+    import re
+    words = sorted(set(re.findall(r"[a-z]+", benchmark_document().decode('utf-8').lower())))
+    handle, path = tempfile.mkstemp(prefix='benchmark-words-', suffix='.txt')
+    with os.fdopen(handle, 'w', encoding='utf-8') as f:
+        f.write("\n".join(words))
+    return path
+
+
+def endpoint_requests(client):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    document = benchmark_document()
+    return {
+        'chat': lambda: client.post(
+            '/chat/carmen/', json.dumps({'message': CHAT_MESSAGE}), content_type='application/json'
+        ),
+        'wikipedia': lambda: client.post(
+            '/scrape/ped/', json.dumps({'url': WIKIPEDIA_URL}), content_type='application/json'
+        ),
+        'rag': lambda: client.post(
+            '/rag/sirius/', {'file': SimpleUploadedFile('benchmark.txt', document), 'query': RAG_QUERY}
+        ),
+        'proofread': lambda: client.post(
+            '/proofread/myne/', {'file': SimpleUploadedFile('benchmark.txt', document)}
+        ),
+    }
+
+
+def run_benchmark(runs):
+    from django.conf import settings
+    from django.test import Client, override_settings
+    from django.test.utils import setup_test_environment, teardown_test_environment
+    from django.db import connection
+    from model.proofcheck import load_dictionary
+
+    setup_test_environment()
+    old_database_name = settings.DATABASES['default']['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    media_root = tempfile.mkdtemp(prefix='benchmark-media-')
+    dictionary_path = benchmark_dictionary()
+
+    overrides = override_settings(
+        MEDIA_ROOT=media_root,
+        ADMISSION_CONTROL={'ENABLED': False},
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'responses': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        },
+        SINGLE_FLIGHT_CROSS_PROCESS=False,
+        PROOFREADER_REVISION_MODE=False,
+        PROOFREADER_DICTIONARY_PATH=dictionary_path,
+    )
+    try:
+        with overrides:
+            load_dictionary.cache_clear()
+            requests = endpoint_requests(Client())
+            timings = {name: [] for name in requests}
+            failures = {}
+            for _ in range(runs):
+                for name, request in requests.items():
+                    start = time.perf_counter()
+                    response = request()
+                    timings[name].append(time.perf_counter() - start)
+                    body = response.content.decode('utf-8', errors='replace')
+                    if response.status_code != 200 or 'error-message' in body:
+                        failures[name] = f"HTTP {response.status_code}: {body[:200]}"
+    finally:
+        load_dictionary.cache_clear()
+        os.remove(dictionary_path)
+        shutil.rmtree(media_root, ignore_errors=True)
+        connection.creation.destroy_test_db(old_database_name, verbosity=0)
+        teardown_test_environment()
+    return timings, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mode', choices=['replay', 'record'], default='replay')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--timing', action='store_true', help="Replay with the recorded upstream latency")
+    args = parser.parse_args()
+
+    os.environ['QUADRANEX_IO_MODE'] = args.mode
+    if args.timing:
+        os.environ['QUADRANEX_IO_REPLAY_TIMING'] = '1'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+    sys.path.insert(0, BASE_DIR)
+    import django
+    django.setup()
+
+    timings, failures = run_benchmark(args.runs)
+
+    print(f"mode: {args.mode}{' (timed)' if args.timing else ''}  runs: {args.runs}")
+    for name, samples in timings.items():
+        samples = sorted(samples)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        print(f"{name:<10} median {statistics.median(samples) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms")
+    for name, failure in failures.items():
+        print(f"{name} failed: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
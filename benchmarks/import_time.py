@@ -0,0 +1,65 @@
+"""Measure worker startup cost of the model app.
+
+Each run starts a fresh interpreter that sets up Django and imports the URL
+configuration (which imports model.views), then reports wall time, peak RSS
+and which heavy backends ended up loaded.
+
+Usage:
+    python benchmarks/import_time.py [--runs N] [--preload]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import json
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD_SCRIPT = """
+import json, os, resource, sys, time
+start = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+import django
+django.setup()
+if {preload}:
+    from model.backends import preload_backends
+    preload_backends()
+import project.urls
+elapsed = time.perf_counter() - start
+heavy = ['groq', 'selenium', 'webdriver_manager', 'docx', 'chardet', 'PyPDF2']
+print(json.dumps({{
+    'seconds': elapsed,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'loaded': [name for name in heavy if name in sys.modules],
+}}))
+"""
+
+
+def run_once(preload):
+    output = subprocess.check_output(
+        [sys.executable, '-c', CHILD_SCRIPT.format(preload=preload)],
+        cwd=BASE_DIR,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+    )
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--preload', action='store_true', help="Preload heavy backends as a warmed-up worker would")
+    args = parser.parse_args()
+
+    results = [run_once(args.preload) for _ in range(args.runs)]
+    seconds = [result['seconds'] for result in results]
+    rss = [result['max_rss_kb'] for result in results]
+
+    print(f"runs:          {args.runs}")
+    print(f"startup (s):   median {statistics.median(seconds):.3f}  min {min(seconds):.3f}  max {max(seconds):.3f}")
+    print(f"peak RSS (MB): median {statistics.median(rss) / 1024:.1f}")
+    print(f"loaded:        {', '.join(results[-1]['loaded']) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ModelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'model'
+
+    def ready(self):
+        # Optional warm-up of heavy backends for production workers
+        preload = getattr(settings, 'PRELOAD_BACKENDS', None)
+        if preload:
+            from model.backends import preload_backends
+            preload_backends(None if preload is True else preload)
@@ -0,0 +1,31 @@
+import importlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Heavy third-party backends; feature modules import these on first use only
+HEAVY_BACKENDS = (
+    'groq',
+    'chardet',
+    'docx',
+    'PyPDF2',
+    'selenium.webdriver',
+    'webdriver_manager.chrome',
+)
+
+
+def preload_backends(names=None):
+    """Import heavy backends ahead of the first request.
+
+    Used by ModelConfig.ready() when PRELOAD_BACKENDS is set, so production
+    workers can pay the import cost at boot instead of on a user request.
+    Returns the names that were imported successfully.
+    """
+    loaded = []
+    for name in names or HEAVY_BACKENDS:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except ImportError as e:
+            logger.warning("Could not preload backend %s: %s", name, e)
+    return loaded
@@ -0,0 +1,99 @@
+import re
+from model.llm import get_groq_client, create_chat_completion
+
+# Simple ChatBot utility
+def get_chat_response(query, model_name="llama3-70b-8192"):
+    try:
+        client = get_groq_client()
+        
+        # Add a system prompt to improve response quality
+        system_prompt = """You are Carmen, the friendly and knowledgeable AI assistant for QuadraNex-AI.
+        You provide clear, accurate, and concise information with a helpful and conversational tone.
+        Format your responses with proper HTML for better readability, including headings, lists, and highlighting of important information when appropriate.
+        If you're unsure about something, acknowledge it rather than making up information.
+        You can discuss a wide range of topics including technology, science, arts, history, and more.
+        When providing explanations, use analogies and examples to make complex concepts easier to understand."""
+        
+        # Check if the query is asking for specific formatting
+        formatting_keywords = ["format", "html", "style", "code", "markdown", "highlight"]
+        should_format = any(keyword in query.lower() for keyword in formatting_keywords)
+        
+        # Add formatting instructions if needed
+        if should_format:
+            system_prompt += """
+            When formatting code or technical content:
+            - Use <pre><code> tags for code blocks
+            - Use appropriate syntax highlighting when possible
+            - Format lists with proper HTML tags
+            - Use <em> and <strong> for emphasis
+            """
+        
+        chat_response = create_chat_completion(
+            client,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": query}
+            ],
+            model=model_name,
+            temperature=0.7,
+            max_tokens=2048
+        )
+        
+        # Add basic formatting if not already present
+        if "<" not in chat_response and ">" not in chat_response:
+            # First handle code blocks if present
+            code_blocks = chat_response.split("```")
+            for i in range(len(code_blocks)):
+                if i % 2 == 1:  # This is a code block
+                    code_blocks[i] = f"<pre><code>{code_blocks[i]}</code></pre>"
+            chat_response = "".join(code_blocks)
+            
+            # Convert markdown-style formatting to HTML
+            # Handle nested formatting by processing strong/bold first
+            chat_response = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', chat_response)
+            chat_response = re.sub(r'\*(.+?)\*', r'<em>\1</em>', chat_response)
+            
+            # Handle lists
+            lines = chat_response.split("\n")
+            in_list = False
+            formatted_lines = []
+            
+            for line in lines:
+                if line.strip().startswith("- "):
+                    if not in_list:
+                        formatted_lines.append("<ul>")
+                        in_list = True
+                    formatted_lines.append(f"<li>{line.strip()[2:]}</li>")
+                elif line.strip().startswith("1. ") or line.strip().startswith("* "):
+                    if not in_list:
+                        formatted_lines.append("<ol>")
+                        in_list = True
+                    formatted_lines.append(f"<li>{line.strip()[2:]}</li>")
+                else:
+                    if in_list:
+                        formatted_lines.append("</ul>" if "<ul>" in formatted_lines[-2] else "</ol>")
+                        in_list = False
+                    if line.strip():
+                        formatted_lines.append(line)
+            
+            if in_list:
+                formatted_lines.append("</ul>" if "<ul>" in formatted_lines[-2] else "</ol>")
+            
+            # Format paragraphs, but skip already formatted content
+            paragraphs = "\n".join(formatted_lines).split("\n\n")
+            formatted_paragraphs = []
+            for p in paragraphs:
+                if p.strip():
+                    if not (p.strip().startswith('<') and p.strip().endswith('>')):  # Skip already formatted content
+                        formatted_paragraphs.append(f"<p>{p.strip()}</p>")
+                    else:
+                        formatted_paragraphs.append(p.strip())
+            chat_response = "\n".join(formatted_paragraphs)
+        
+        return chat_response
+    except ValueError as e:
+        # Handle missing API key
+        return f"<div class='error-message'>Configuration Error: {str(e)}</div>"
+    except Exception as e:
+        # Handle other errors
+        return f"<div class='error-message'>Sorry, I encountered an error: {str(e)}</div>"
@@ -0,0 +1,101 @@
+import re
+from importlib.util import find_spec
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+# Whitespace runs that include a line break; browsers render them as a single space
+LINE_BREAK_WHITESPACE_RE = re.compile(r'\s*\n\s*')
+PRESERVED_BLOCK_RE = re.compile(r'(<(pre|textarea)\b.*?</\2>)', re.IGNORECASE | re.DOTALL)
+
+
+def _collapse_line_breaks(match):
+    # Keep paragraph breaks: the frontend splits plain-text responses on blank lines
+    return '\n\n' if match.group(0).count('\n') > 1 else '\n'
+
+
+def minify_html(html):
+    """Drop indentation and collapse blank-line runs in generated HTML without changing how it renders.
+
+    A run of blank lines becomes a single blank line, since the frontend splits
+    responses into paragraphs on it. Content of <pre> and <textarea> blocks is left untouched.
+    """
+    parts = PRESERVED_BLOCK_RE.split(html)
+    minified = []
+    # split() yields [text, block, tag name, text, block, tag name, ...]
+    for index in range(0, len(parts), 3):
+        minified.append(LINE_BREAK_WHITESPACE_RE.sub(_collapse_line_breaks, parts[index]))
+        if index + 1 < len(parts):
+            minified.append(parts[index + 1])
+    return ''.join(minified).strip()
+
+
+def accepts_brotli(accept_encoding):
+    """Whether an Accept-Encoding header allows brotli, i.e. lists `br` with a q-value above 0."""
+    for coding in accept_encoding.split(','):
+        name, *params = [part.strip() for part in coding.split(';')]
+        if name.lower() != 'br':
+            continue
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Compress responses with brotli when the client and server support it, else gzip.
+
+    Brotli needs the optional `brotli` package; without it this behaves exactly
+    like Django's GZipMiddleware, including for streaming responses.
+    """
+
+    brotli_available = find_spec('brotli') is not None
+
+    def process_response(self, request, response):
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        # Async streams are left to the gzip implementation
+        if not self.brotli_available or not accepts_brotli(accept_encoding) or \
+                (response.streaming and response.is_async):
+            return super().process_response(request, response)
+
+        if not response.streaming and len(response.content) < 200:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+
+        import brotli
+        quality = getattr(settings, 'BROTLI_QUALITY', 5)
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if response.streaming:
+            response.streaming_content = self._brotli_sequence(response.streaming_content, quality)
+            del response.headers['Content-Length']
+        else:
+            compressed_content = brotli.compress(response.content, quality=quality)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+    @staticmethod
+    def _brotli_sequence(sequence, quality):
+        import brotli
+        compressor = brotli.Compressor(quality=quality)
+        for chunk in sequence:
+            data = compressor.process(chunk)
+            # Flush per chunk so streamed output reaches the client without waiting for more input
+            data += compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
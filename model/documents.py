@@ -0,0 +1,137 @@
+import os
+import mimetypes
+from importlib.util import find_spec
+from django.conf import settings
+from model.storage import store_upload, unpin_upload, discard_upload
+
+
+class DocumentReadError(Exception):
+    """Raised when no text can be extracted from a document; the message is shown to the user."""
+
+
+# Detect the encoding of raw bytes, falling back to utf-8 when unsure
+def detect_encoding(raw_data):
+    import chardet
+    result = chardet.detect(raw_data)
+    encoding = result['encoding'] if result['encoding'] else 'utf-8'
+    confidence = result.get('confidence', 0)
+
+    # If confidence is low, use a more reliable encoding
+    if confidence < 0.7:
+        encoding = 'utf-8'
+    return encoding
+
+
+def read_text_file(file_path, sample_size=10000):
+    # First detect the file encoding from a sample
+    with open(file_path, 'rb') as file:
+        encoding = detect_encoding(file.read(sample_size) if sample_size else file.read())
+
+    # Try to read with detected encoding
+    try:
+        with open(file_path, 'r', encoding=encoding) as file:
+            return file.read()
+    except UnicodeDecodeError:
+        # First fallback: utf-8 with error replacement
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+                return file.read()
+        except UnicodeDecodeError:
+            # Second fallback: latin-1 (should handle any byte sequence)
+            with open(file_path, 'r', encoding='latin-1') as file:
+                return file.read()
+
+
+# Extract plain text from PDF, DOCX or text documents
+def extract_document_text(file_path):
+    file_extension = os.path.splitext(file_path)[1].lower()
+
+    if file_extension == '.pdf':
+        try:
+            from PyPDF2 import PdfReader
+            reader = PdfReader(file_path)
+            document_content = '\n'.join([page.extract_text() for page in reader.pages if page.extract_text()])
+        except ImportError:
+            raise DocumentReadError("PyPDF2 library not installed for PDF processing")
+        except Exception as e:
+            raise DocumentReadError(f"Error reading PDF: {str(e)}")
+        if not document_content.strip():
+            raise DocumentReadError("Could not extract text from PDF file. The file may be scanned or contain only images.")
+        return document_content
+
+    if file_extension in ['.docx', '.doc']:
+        try:
+            from docx import Document
+            doc = Document(file_path)
+            return '\n'.join([para.text for para in doc.paragraphs])
+        except ImportError:
+            raise DocumentReadError("python-docx library not installed for DOCX processing")
+        except Exception as e:
+            raise DocumentReadError(f"Error reading DOCX: {str(e)}")
+
+    try:
+        return read_text_file(file_path)
+    except Exception as e:
+        raise DocumentReadError(f"Error reading file: {str(e)}")
+
+
+def get_document_type(file_path):
+    file_extension = os.path.splitext(file_path)[1].lower()
+    if file_extension in ['.md', '.markdown']:
+        return "markdown"
+    elif file_extension in ['.tex']:
+        return "LaTeX"
+    elif file_extension in ['.html', '.htm']:
+        return "HTML"
+    elif file_extension in ['.pdf']:
+        return "PDF"
+    return "text"
+
+
+# File handling utility
+def handle_uploaded_file(file):
+    MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    if file.size > MAX_FILE_SIZE:
+        raise ValueError(f"File size exceeds maximum limit of {MAX_FILE_SIZE/1024/1024}MB")
+
+    # Save file first; identical re-uploads reuse the stored copy.
+    # The upload stays pinned against GC until the caller unpins file_info['upload']
+    upload = store_upload(file, pin=True)
+    full_path = os.path.join(settings.MEDIA_ROOT, upload.path)
+
+    try:
+        # Determine file type
+        mime_type, _ = mimetypes.guess_type(file.name)
+        file_extension = os.path.splitext(file.name)[1].lower()
+
+        # Handle text files (TXT, CSV, etc.)
+        if mime_type == 'text/plain' or file_extension in ['.txt', '.csv', '.log', '.md']:
+            content = read_text_file(full_path, sample_size=None)
+            file_info = {'path': full_path, 'upload': upload.path, 'content': content, 'type': 'text'}
+
+        # Handle PDF files; content will be extracted when needed
+        elif mime_type == 'application/pdf' or file_extension == '.pdf':
+            if find_spec('PyPDF2') is None:
+                return {'path': full_path, 'upload': upload.path, 'type': 'document',
+                        'error': 'PyPDF2 library not installed for PDF processing'}
+            file_info = {'path': full_path, 'upload': upload.path, 'type': 'pdf'}
+
+        # Handle DOCX files; content will be extracted when needed
+        elif mime_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document' or \
+             file_extension in ['.docx', '.doc']:
+            if find_spec('docx') is None:
+                return {'path': full_path, 'upload': upload.path, 'type': 'document',
+                        'error': 'python-docx library not installed for DOCX processing'}
+            file_info = {'path': full_path, 'upload': upload.path, 'type': 'docx'}
+        else:
+            raise ValueError(f"Unsupported file type: {mime_type or file_extension}")
+    except Exception as e:
+        # Clean up the file if there was an error, unless another request is using it
+        unpin_upload(upload.path)
+        discard_upload(upload.path)
+        raise ValueError(f"Error processing file: {str(e)}")
+
+    # Precompute the document profile while the request moves on to the LLM
+    from model.profiles import schedule_profile
+    schedule_profile(full_path)
+    return file_info
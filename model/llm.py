@@ -0,0 +1,36 @@
+import os
+import json
+import hashlib
+from model.singleflight import llm_flight
+from model.replay import io_mode, RecordingClient, RECORD, REPLAY
+
+
+# Initialize Groq client
+def get_groq_client():
+    # Recorded responses are replayed offline without an API key
+    mode = io_mode()
+    if mode == REPLAY:
+        return RecordingClient()
+    
+    api_key = os.environ.get('GROQ_API_KEY')
+    if not api_key:
+        raise ValueError("GROQ_API_KEY environment variable is not set. Please add it to your environment variables.")
+    from groq import Groq
+    client = Groq(api_key=api_key)
+    return RecordingClient(client) if mode == RECORD else client
+
+
+def completion_key(**params):
+    # Identical prompts and sampling parameters produce the same key
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# Chat completion shared by all identical requests that are in flight
+def create_chat_completion(client, **params):
+    def call():
+        response = client.chat.completions.create(**params)
+        return response.choices[0].message.content
+
+    return llm_flight.do(completion_key(**params), call)
+
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from model.storage import adopt_untracked_uploads, collect_garbage
+
+
+class Command(BaseCommand):
+    help = "Delete expired and least recently used uploads to keep media/uploads within its quota"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, default=None,
+                            help="Delete unpinned uploads not accessed for this many seconds "
+                                 "(defaults to UPLOAD_MAX_AGE_SECONDS)")
+        parser.add_argument('--quota', type=int, default=None,
+                            help="Maximum total upload size in bytes (defaults to UPLOAD_QUOTA_BYTES)")
+        parser.add_argument('--adopt', action='store_true',
+                            help="Start tracking files in media/uploads that have no record yet")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report what would be deleted without deleting anything")
+
+    def handle(self, *args, **options):
+        if options['adopt']:
+            adopted = adopt_untracked_uploads()
+            self.stdout.write(f"Adopted {adopted} untracked uploads")
+
+        stats = collect_garbage(
+            max_age=options['max_age'],
+            quota_bytes=options['quota'],
+            dry_run=options['dry_run'],
+        )
+        prefix = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {stats['deleted']} uploads ({stats['freed_bytes']} bytes), "
+            f"{stats['missing']} missing records; {stats['total_bytes']} bytes remain"
+        ))
@@ -0,0 +1,225 @@
+import math
+import time
+import threading
+from collections import defaultdict, deque
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import JsonResponse
+
+DEFAULT_ADMISSION_CONTROL = {
+    'ENABLED': True,
+    'TOTAL_CONCURRENCY': 8,
+    'TRUST_X_FORWARDED_FOR': False,
+    'CLASSES': {},
+}
+
+DEFAULT_CLASS = {
+    'paths': [],
+    'rate': 1.0,           # Tokens added to each client's bucket per second
+    'burst': 10,           # Bucket capacity
+    'concurrency': 4,      # Requests of this class running at once
+    'weight': 1,           # Share of free slots when classes compete
+    'max_queue': 16,       # Waiting requests before new ones are rejected
+    'max_wait': 10,        # Seconds a request may wait for a slot
+    'retry_after': 5,      # Hint sent when the queue is full or the wait times out
+}
+
+
+def client_key(request):
+    """Identify the client making a request, for per-client limits."""
+    config = getattr(settings, 'ADMISSION_CONTROL', {})
+    if config.get('TRUST_X_FORWARDED_FOR'):
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', 'unknown')
+
+
+class TokenBuckets:
+    """Per-client token buckets that share one rate and capacity."""
+
+    MAX_CLIENTS = 10000
+
+    def __init__(self, rate, burst):
+        if rate <= 0 or burst < 1:
+            raise ValueError("Token buckets need a positive rate and a burst of at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def take(self, client):
+        """Take one token; returns (allowed, seconds until a token is available)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self._buckets[client] = (tokens - 1, now)
+                allowed, retry_after = True, 0
+            else:
+                self._buckets[client] = (tokens, now)
+                allowed, retry_after = False, (1 - tokens) / self.rate
+
+            if len(self._buckets) > self.MAX_CLIENTS:
+                self._prune(now)
+        return allowed, retry_after
+
+    def _prune(self, now):
+        # Buckets that have refilled completely carry no state worth keeping
+        full_after = self.burst / self.rate
+        for client, (_, updated) in list(self._buckets.items()):
+            if now - updated >= full_after:
+                del self._buckets[client]
+
+
+class _Waiter:
+    def __init__(self, endpoint_class, tag):
+        self.endpoint_class = endpoint_class
+        self.tag = tag
+        self.event = threading.Event()
+        self.granted = False
+
+
+class FairScheduler:
+    """Bounded concurrency per endpoint class, shared fairly by weight.
+
+    Requests that cannot start immediately queue per class. Whenever a slot
+    frees up, the waiting request with the smallest virtual finish tag among
+    classes that are below their own limit is started (weighted fair queueing),
+    so classes with a higher weight get a proportionally larger share.
+    """
+
+    def __init__(self, total, classes):
+        self._lock = threading.Lock()
+        self._total = total
+        self._in_flight = 0
+        self._limits = {name: config['concurrency'] for name, config in classes.items()}
+        self._weights = {name: config['weight'] for name, config in classes.items()}
+        self._max_queue = {name: config['max_queue'] for name, config in classes.items()}
+        self._class_in_flight = defaultdict(int)
+        self._queues = {name: deque() for name in classes}
+        self._finish_tags = defaultdict(float)
+        self._virtual_time = 0.0
+
+    def _can_start(self, endpoint_class):
+        return self._in_flight < self._total and self._class_in_flight[endpoint_class] < self._limits[endpoint_class]
+
+    def _start(self, endpoint_class):
+        self._in_flight += 1
+        self._class_in_flight[endpoint_class] += 1
+
+    def acquire(self, endpoint_class, timeout):
+        """Wait for a slot; returns False if the queue is full or the wait timed out."""
+        with self._lock:
+            queue = self._queues[endpoint_class]
+            if not queue and self._can_start(endpoint_class):
+                self._start(endpoint_class)
+                return True
+            if len(queue) >= self._max_queue[endpoint_class]:
+                return False
+            tag = max(self._virtual_time, self._finish_tags[endpoint_class]) + 1 / self._weights[endpoint_class]
+            self._finish_tags[endpoint_class] = tag
+            waiter = _Waiter(endpoint_class, tag)
+            queue.append(waiter)
+
+        if waiter.event.wait(timeout):
+            return True
+        with self._lock:
+            if waiter.granted:
+                return True
+            queue.remove(waiter)
+            return False
+
+    def release(self, endpoint_class):
+        with self._lock:
+            self._in_flight -= 1
+            self._class_in_flight[endpoint_class] -= 1
+            self._dispatch()
+
+    def _dispatch(self):
+        while self._in_flight < self._total:
+            candidates = [
+                queue[0] for name, queue in self._queues.items()
+                if queue and self._class_in_flight[name] < self._limits[name]
+            ]
+            if not candidates:
+                return
+            waiter = min(candidates, key=lambda candidate: candidate.tag)
+            self._queues[waiter.endpoint_class].popleft()
+            self._virtual_time = waiter.tag
+            self._start(waiter.endpoint_class)
+            waiter.granted = True
+            waiter.event.set()
+
+
+def validate_class(name, class_config):
+    unknown = set(class_config) - set(DEFAULT_CLASS)
+    if unknown:
+        raise ImproperlyConfigured(f"ADMISSION_CONTROL class '{name}' has unknown options: {', '.join(sorted(unknown))}")
+    for option in ('rate', 'weight'):
+        if not class_config[option] > 0:
+            raise ImproperlyConfigured(f"ADMISSION_CONTROL class '{name}' needs a positive '{option}'")
+    for option in ('burst', 'concurrency'):
+        if not class_config[option] >= 1:
+            raise ImproperlyConfigured(f"ADMISSION_CONTROL class '{name}' needs '{option}' of at least 1")
+    for option in ('max_queue', 'max_wait', 'retry_after'):
+        if class_config[option] < 0:
+            raise ImproperlyConfigured(f"ADMISSION_CONTROL class '{name}' needs a non-negative '{option}'")
+
+
+def too_many_requests(message, retry_after):
+    response = JsonResponse({'error': message}, status=429)
+    response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+class AdmissionControlMiddleware:
+    """Rate-limit and schedule requests to the LLM endpoints.
+
+    Configured through the ADMISSION_CONTROL setting. Each endpoint class has
+    per-client token buckets and a concurrency limit; requests over a limit are
+    rejected early with 429 and a Retry-After hint. State lives in process
+    memory, so every worker process enforces the limits on its own.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = {**DEFAULT_ADMISSION_CONTROL, **getattr(settings, 'ADMISSION_CONTROL', {})}
+        self.enabled = config['ENABLED']
+        self.classes = {
+            name: {**DEFAULT_CLASS, **class_config}
+            for name, class_config in config['CLASSES'].items()
+        }
+        for name, class_config in self.classes.items():
+            validate_class(name, class_config)
+        if not config['TOTAL_CONCURRENCY'] >= 1:
+            raise ImproperlyConfigured("ADMISSION_CONTROL needs a TOTAL_CONCURRENCY of at least 1")
+        self.buckets = {
+            name: TokenBuckets(class_config['rate'], class_config['burst'])
+            for name, class_config in self.classes.items()
+        }
+        self.scheduler = FairScheduler(config['TOTAL_CONCURRENCY'], self.classes)
+
+    def endpoint_class(self, path):
+        for name, class_config in self.classes.items():
+            if any(path.startswith(prefix) for prefix in class_config['paths']):
+                return name
+        return None
+
+    def __call__(self, request):
+        endpoint_class = self.endpoint_class(request.path) if self.enabled else None
+        if endpoint_class is None or request.method != 'POST':
+            return self.get_response(request)
+
+        class_config = self.classes[endpoint_class]
+        allowed, retry_after = self.buckets[endpoint_class].take(client_key(request))
+        if not allowed:
+            return too_many_requests('Too many requests. Please slow down and try again shortly.', retry_after)
+
+        if not self.scheduler.acquire(endpoint_class, class_config['max_wait']):
+            return too_many_requests('The server is busy. Please try again shortly.', class_config['retry_after'])
+        try:
+            return self.get_response(request)
+        finally:
+            self.scheduler.release(endpoint_class)
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WikipediaSectionSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('article_url', models.URLField(max_length=500)),
+                ('section_title', models.CharField(max_length=255)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('revision_id', models.BigIntegerField(blank=True, null=True)),
+                ('summary', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('article_url', 'section_title', 'content_hash'), name='unique_wikipedia_section_summary')],
+            },
+        ),
+    ]
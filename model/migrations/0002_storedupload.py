@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, unique=True)),
+                ('original_name', models.CharField(max_length=255)),
+                ('content_hash', models.CharField(db_index=True, max_length=64)),
+                ('size', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('pin_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model', '0003_documentprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProofreadRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_key', models.CharField(db_index=True, max_length=255)),
+                ('original_name', models.CharField(max_length=255)),
+                ('paragraphs', models.JSONField()),
+                ('base_report', models.TextField()),
+                ('base_paragraphs', models.JSONField()),
+                ('findings', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model', '0004_proofreadrevision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storedupload',
+            name='pinned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
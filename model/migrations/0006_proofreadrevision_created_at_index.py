@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('model', '0005_storedupload_pinned_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='proofreadrevision',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
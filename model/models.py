@@ -1,3 +1,73 @@
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
+
+# Cached section-level summaries used by the hierarchical Wikipedia summariser
+class WikipediaSectionSummary(models.Model):
+    article_url = models.URLField(max_length=500)
+    section_title = models.CharField(max_length=255)
+    # Hash of the section text; unchanged sections keep their summary across revisions
+    content_hash = models.CharField(max_length=64)
+    revision_id = models.BigIntegerField(null=True, blank=True)
+    summary = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['article_url', 'section_title', 'content_hash'],
+                name='unique_wikipedia_section_summary',
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.article_url} - {self.section_title}"
+
+
+# Uploaded files tracked by the upload storage lifecycle manager
+class StoredUpload(models.Model):
+    # Path relative to MEDIA_ROOT
+    path = models.CharField(max_length=500, unique=True)
+    original_name = models.CharField(max_length=255)
+    content_hash = models.CharField(max_length=64, db_index=True)
+    size = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed = models.DateTimeField(default=timezone.now, db_index=True)
+    # Number of requests and jobs using this upload; pinned uploads are not collected
+    pin_count = models.PositiveIntegerField(default=0)
+    # Time of the latest pin. Pins older than UPLOAD_PIN_TIMEOUT_SECONDS are treated as
+    # leaked by a worker that died before unpinning, and no longer protect the upload
+    pinned_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.path
+
+
+# Precomputed text, statistics and chunk index of an upload (zlib-compressed JSON)
+class DocumentProfile(models.Model):
+    upload = models.OneToOneField(StoredUpload, on_delete=models.CASCADE, related_name='profile')
+    version = models.PositiveSmallIntegerField()
+    data = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Profile of {self.upload.path}"
+
+
+# Proofread versions of a client's document, used to re-proofread only changed paragraphs
+class ProofreadRevision(models.Model):
+    # Session key of the browser that uploaded the document
+    client_key = models.CharField(max_length=255, db_index=True)
+    original_name = models.CharField(max_length=255)
+    # Digests of the paragraphs of this version, in order
+    paragraphs = models.JSONField()
+    # Full LLM report of the last complete proofread and the paragraphs it covered
+    base_report = models.TextField()
+    base_paragraphs = models.JSONField()
+    # Paragraph digest -> findings for paragraphs reviewed incrementally since then
+    findings = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.original_name} ({self.client_key})"
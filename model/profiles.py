@@ -0,0 +1,251 @@
+import re
+import json
+import zlib
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection
+from model.documents import extract_document_text, get_document_type
+from model.storage import relative_upload_path, pin_upload, unpin_upload
+
+logger = logging.getLogger(__name__)
+
+# Bump when the profile layout changes so stale profiles are rebuilt
+PROFILE_VERSION = 1
+
+CHUNK_SIZE = 2000  # Target characters per chunk of the index
+MAX_INDEX_TERMS = 40  # Most frequent terms indexed per chunk
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how i if in into is it its itself just me more most my myself no
+nor not now of off on once only or other our ours ourselves out over own same she should so some such than
+that the their theirs them themselves then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your yours yourself yourselves
+""".split())
+
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z'\-]*")
+SENTENCE_RE = re.compile(r"[^.!?]+[.!?]*")
+VOWEL_GROUP_RE = re.compile(r"[aeiouy]+")
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    # Llama-family tokenizers average roughly four characters per token on English text
+    return (len(text) + 3) // 4
+
+
+def index_terms(text):
+    return [word.lower() for word in WORD_RE.findall(text) if len(word) > 2 and word.lower() not in STOPWORDS]
+
+
+def split_chunks(text, chunk_size=CHUNK_SIZE):
+    """Split text into (start, end) offsets of roughly chunk_size characters on paragraph boundaries."""
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            boundary = text.rfind('\n', start + chunk_size // 2, end)
+            if boundary == -1:
+                boundary = text.rfind(' ', start + chunk_size // 2, end)
+            if boundary != -1:
+                end = boundary + 1
+        chunks.append([start, end])
+        start = end
+    return chunks
+
+
+def count_syllables(word):
+    word = word.lower().rstrip('e') or word.lower()
+    return max(1, len(VOWEL_GROUP_RE.findall(word)))
+
+
+def readability_stats(text):
+    sentences = [sentence for sentence in SENTENCE_RE.findall(text) if WORD_RE.search(sentence)]
+    words = WORD_RE.findall(text)
+    if not sentences or not words:
+        return {'sentences': 0, 'words': 0, 'syllables': 0, 'avg_sentence_length': 0,
+                'flesch_reading_ease': 0, 'flesch_kincaid_grade': 0}
+
+    syllables = sum(count_syllables(word) for word in words)
+    words_per_sentence = len(words) / len(sentences)
+    syllables_per_word = syllables / len(words)
+    return {
+        'sentences': len(sentences),
+        'words': len(words),
+        'syllables': syllables,
+        'avg_sentence_length': round(words_per_sentence, 1),
+        'flesch_reading_ease': round(206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word, 1),
+        'flesch_kincaid_grade': round(0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59, 1),
+    }
+
+
+def document_outline(text):
+    """Detect headings: markdown headings, numbered headings and short all-caps lines."""
+    outline = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or len(line) > 100:
+            continue
+        markdown = re.match(r'^(#{1,6})\s+(.+)$', line)
+        numbered = re.match(r'^(\d+(?:\.\d+)*)\.?\s+([A-Z].{0,80})$', line)
+        if markdown:
+            outline.append({'level': len(markdown.group(1)), 'title': markdown.group(2).strip()})
+        elif numbered and not line.endswith(('.', ',', ';')):
+            outline.append({'level': numbered.group(1).count('.') + 1, 'title': line})
+        elif line.isupper() and len(line.split()) <= 10 and WORD_RE.search(line):
+            outline.append({'level': 1, 'title': line})
+    return outline
+
+
+def build_profile(file_path):
+    """Extract text and precompute everything the LLM features need from a document.
+
+    Raises DocumentReadError if no text can be extracted.
+    """
+    text = extract_document_text(file_path)
+    chunks = split_chunks(text)
+
+    # Inverted index: term -> ids of the chunks where it is among the most frequent terms
+    index = {}
+    for chunk_id, (start, end) in enumerate(chunks):
+        for term, _ in Counter(index_terms(text[start:end])).most_common(MAX_INDEX_TERMS):
+            index.setdefault(term, []).append(chunk_id)
+
+    return {
+        'version': PROFILE_VERSION,
+        'document_type': get_document_type(file_path),
+        'text': text,
+        'characters': len(text),
+        'tokens': estimate_tokens(text),
+        'chunks': chunks,
+        'index': index,
+        'readability': readability_stats(text),
+        'outline': document_outline(text),
+    }
+
+
+def encode_profile(profile):
+    return zlib.compress(json.dumps(profile, separators=(',', ':')).encode('utf-8'))
+
+
+def decode_profile(data):
+    return json.loads(zlib.decompress(bytes(data)).decode('utf-8'))
+
+
+def _load_profile(path):
+    from model.models import DocumentProfile
+
+    row = DocumentProfile.objects.filter(upload__path=path, version=PROFILE_VERSION).only('data').first()
+    return decode_profile(row.data) if row else None
+
+
+def _store_profile(path, profile):
+    from model.models import DocumentProfile, StoredUpload
+
+    upload = StoredUpload.objects.filter(path=path).first()
+    if upload is not None:
+        DocumentProfile.objects.update_or_create(
+            upload=upload,
+            defaults={'version': PROFILE_VERSION, 'data': encode_profile(profile)}
+        )
+
+
+def _compute_and_store(path, full_path):
+    try:
+        profile = _load_profile(path)
+        if profile is None:
+            profile = build_profile(full_path)
+            _store_profile(path, profile)
+        return profile
+    finally:
+        unpin_upload(path)
+        # Executor threads must not leak their database connection
+        connection.close()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'DOCUMENT_PROFILE_WORKERS', 2),
+                thread_name_prefix='document-profile'
+            )
+        return _executor
+
+
+# Start building the profile of a freshly saved upload in the background
+def schedule_profile(full_path):
+    path = relative_upload_path(full_path)
+    with _pending_lock:
+        if path in _pending:
+            return _pending[path]
+        # Keep the upload pinned against GC until the job has read it
+        pin_upload(path)
+        future = _get_executor().submit(_compute_and_store, path, full_path)
+        _pending[path] = future
+
+    def done(_):
+        with _pending_lock:
+            _pending.pop(path, None)
+        if future.exception() is not None:
+            logger.info("Could not profile %s: %s", path, future.exception())
+
+    future.add_done_callback(done)
+    return future
+
+
+def get_document_profile(file_path):
+    """Return the profile of a document, waiting for or building it if needed.
+
+    Raises DocumentReadError if no text can be extracted.
+    """
+    path = relative_upload_path(file_path)
+    with _pending_lock:
+        future = _pending.get(path)
+    if future is not None:
+        return future.result()
+
+    profile = _load_profile(path)
+    if profile is None:
+        profile = build_profile(file_path)
+        _store_profile(path, profile)
+    return profile
+
+
+def select_chunks(profile, query, limit):
+    """Pick the chunks most relevant to the query, in document order, within limit characters."""
+    text = profile['text']
+    if len(text) <= limit:
+        return text
+
+    scores = Counter()
+    for term in set(index_terms(query)):
+        for chunk_id in profile['index'].get(term, []):
+            scores[chunk_id] += 1
+
+    # Always keep the opening chunk, it usually introduces the document
+    ranked = [0] + [chunk_id for chunk_id, _ in scores.most_common() if chunk_id != 0]
+    seen = set(ranked)
+    ranked += [chunk_id for chunk_id in range(len(profile['chunks'])) if chunk_id not in seen]
+
+    separator = '\n...\n'
+    selected = []
+    used = 0
+    for chunk_id in ranked:
+        start, end = profile['chunks'][chunk_id]
+        size = end - start + (len(separator) if selected else 0)
+        if used + size > limit:
+            continue
+        selected.append(chunk_id)
+        used += size
+    return separator.join(text[slice(*profile['chunks'][chunk_id])] for chunk_id in sorted(selected))
@@ -0,0 +1,216 @@
+import re
+import os
+import logging
+from functools import lru_cache
+from django.conf import settings
+from django.utils.html import escape
+
+logger = logging.getLogger(__name__)
+
+MAX_FINDINGS = 200  # Findings listed in the report
+MAX_SUGGESTION_WORDS = 100  # Unknown words for which corrections are looked up
+LONG_SENTENCE_WORDS = 35
+
+WORD_RE = re.compile(r"\b[A-Za-z][a-z]*(?:'[a-z]+)?\b")
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+SUFFIXES = ("'s", 's', 'es', 'ed', 'd', 'ing', 'ly', 'er', 'est')
+
+# Abbreviations that end with a period without ending the sentence
+ABBREVIATIONS = frozenset({
+    'etc', 'vs', 'cf', 'al', 'approx', 'esp', 'incl', 'resp', 'viz', 'fig', 'eg', 'ie', 'e.g', 'i.e',
+    'a.m', 'p.m', 'mr', 'mrs', 'ms', 'dr', 'prof', 'st', 'jr', 'sr', 'no',
+})
+
+# Mechanical rules: (name, pattern, message). A match whose "abbreviation" group
+# is a known abbreviation is not reported.
+RULES = [
+    ('repeated-word', re.compile(r"\b(\w+)\s+\1\b", re.IGNORECASE), "Repeated word"),
+    ('space-before-punctuation', re.compile(r"\w[^\S\n]+[,.;:!?](?![\d.])"), "Space before punctuation"),
+    ('missing-space', re.compile(r"[a-z][,;:!?](?=[A-Za-z])|[a-z]{2}\.(?=[A-Z][a-z])"), "Missing space after punctuation"),
+    ('repeated-punctuation', re.compile(r"(?<!\.)\.\.(?!\.)|([,;:])\1+|[!?]{2,}"), "Repeated punctuation"),
+    ('multiple-spaces', re.compile(r"\w[^\S\n]{2,}\w"), "Multiple spaces between words"),
+    ('sentence-case', re.compile(r"(?<![\w.])(?P<abbreviation>[A-Za-z][A-Za-z.]*[a-z])[.!?]\s+[a-z]"),
+     "Sentence does not start with a capital letter"),
+    # Skips "i.e.", "(i)" and "i)" list numbering
+    ('lowercase-i', re.compile(r"(?<![\w'(])i(?![\w'.)])"), "Pronoun \"I\" should be capitalised"),
+]
+SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]*")
+
+
+@lru_cache(maxsize=1)
+def load_dictionary():
+    """Load the spell-check word list once per process; returns None when unavailable."""
+    path = getattr(settings, 'PROOFREADER_DICTIONARY_PATH', None)
+    if not path or not os.path.exists(path):
+        logger.warning("Proofreader dictionary not found at %s; spell check disabled", path)
+        return None
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return frozenset(line.strip().lower() for line in f if line.strip())
+
+
+def is_known(word, dictionary):
+    if word in dictionary:
+        return True
+    # Accept simple inflections of dictionary words
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+            stem = word[:-len(suffix)]
+            if stem in dictionary or stem + 'e' in dictionary or (
+                len(stem) > 2 and stem[-1] == stem[-2] and stem[:-1] in dictionary
+            ):
+                return True
+    return False
+
+
+def suggest(word, dictionary):
+    # Dictionary words one edit away, in a stable order
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    candidates = set()
+    candidates.update(left + right[1:] for left, right in splits if right)
+    candidates.update(left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1)
+    candidates.update(left + c + right[1:] for left, right in splits if right for c in LETTERS)
+    candidates.update(left + c + right for left, right in splits for c in LETTERS)
+    return sorted(candidate for candidate in candidates if candidate in dictionary and candidate != word)[:3]
+
+
+def _line_of(text, position, line_starts):
+    # Binary search over precomputed line offsets
+    low, high = 0, len(line_starts) - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if line_starts[middle] <= position:
+            low = middle
+        else:
+            high = middle - 1
+    return low + 1
+
+
+def _excerpt(text, start, end):
+    left = max(0, text.rfind(' ', 0, max(0, start - 20)) + 1)
+    right = text.find(' ', min(len(text), end + 20))
+    right = len(text) if right == -1 else right
+    return text[left:right].replace('\n', ' ').strip()
+
+
+def spelling_findings(text, dictionary):
+    findings = []
+    suggestions = {}
+    for match in WORD_RE.finditer(text):
+        word = match.group(0)
+        # Skip capitalised words (likely names) and very short words
+        if len(word) < 3 or word[0].isupper():
+            continue
+        lower = word.lower()
+        if is_known(lower, dictionary):
+            continue
+        if lower not in suggestions and len(suggestions) < MAX_SUGGESTION_WORDS:
+            suggestions[lower] = suggest(lower, dictionary)
+        findings.append({
+            'rule': 'spelling',
+            'message': f"Possible misspelling: \"{word}\"",
+            'start': match.start(),
+            'end': match.end(),
+            'suggestions': suggestions.get(lower, []),
+        })
+    return findings
+
+
+def rule_findings(text):
+    findings = []
+    for name, pattern, message in RULES:
+        for match in pattern.finditer(text):
+            if 'abbreviation' in pattern.groupindex and match.group('abbreviation').lower() in ABBREVIATIONS:
+                continue
+            findings.append({
+                'rule': name,
+                'message': message,
+                'start': match.start(),
+                'end': match.end(),
+                'suggestions': [],
+            })
+
+    # Unbalanced brackets and quotes are reported once per document
+    for opening, closing, label in (('(', ')', 'parentheses'), ('[', ']', 'brackets')):
+        if text.count(opening) != text.count(closing):
+            findings.append({'rule': 'unbalanced', 'message': f"Unbalanced {label}",
+                             'start': 0, 'end': 0, 'suggestions': []})
+    if text.count('"') % 2:
+        findings.append({'rule': 'unbalanced', 'message': "Unbalanced double quotes",
+                         'start': 0, 'end': 0, 'suggestions': []})
+    return findings
+
+
+def long_sentences(text):
+    return [
+        sentence.strip() for sentence in SENTENCE_RE.findall(text)
+        if len(sentence.split()) > LONG_SENTENCE_WORDS
+    ]
+
+
+def run_local_checks(text):
+    """Run the deterministic spelling and mechanical checks over a document.
+
+    Returns a dict with position-sorted findings, the sentences that are too long
+    and whether the spell check ran. The same text always yields the same result.
+    """
+    dictionary = load_dictionary()
+    findings = rule_findings(text)
+    if dictionary is not None:
+        findings += spelling_findings(text, dictionary)
+    findings.sort(key=lambda finding: (finding['start'], finding['rule']))
+
+    line_starts = [0] + [match.end() for match in re.finditer('\n', text)]
+    for finding in findings:
+        finding['line'] = _line_of(text, finding['start'], line_starts)
+        finding['excerpt'] = _excerpt(text, finding['start'], finding['end']) if finding['end'] else ''
+
+    return {
+        'findings': findings,
+        'long_sentences': long_sentences(text),
+        'spell_check': dictionary is not None,
+    }
+
+
+def describe_finding(finding):
+    description = finding['message']
+    if finding['suggestions']:
+        description += f" (did you mean: {', '.join(finding['suggestions'])}?)"
+    return description
+
+
+def render_local_report(checks, readability):
+    """Render local check results as the GRAMMAR & SPELLING and READABILITY sections."""
+    findings = checks['findings']
+    items = []
+    for finding in findings[:MAX_FINDINGS]:
+        location = f"Line {finding['line']}: " if finding['end'] else ''
+        excerpt = f" &ndash; <em>&hellip;{escape(finding['excerpt'])}&hellip;</em>" if finding['excerpt'] else ''
+        items.append(f"<li>{location}{escape(describe_finding(finding))}{excerpt}</li>")
+    if len(findings) > MAX_FINDINGS:
+        items.append(f"<li>&hellip; and {len(findings) - MAX_FINDINGS} more</li>")
+
+    if items:
+        grammar = f"<ul>{''.join(items)}</ul>"
+    else:
+        grammar = "<p>No mechanical spelling, grammar or punctuation issues were found.</p>"
+    if not checks['spell_check']:
+        grammar += "<p><em>No spell-check dictionary is configured; spelling is reviewed by Myne below.</em></p>"
+
+    readability_items = [
+        f"<li>Flesch reading ease: <strong>{readability['flesch_reading_ease']}</strong></li>",
+        f"<li>Flesch-Kincaid grade level: <strong>{readability['flesch_kincaid_grade']}</strong></li>",
+        f"<li>Words: {readability['words']}, sentences: {readability['sentences']}, "
+        f"average sentence length: {readability['avg_sentence_length']} words</li>",
+    ]
+    if checks['long_sentences']:
+        readability_items.append(
+            f"<li>{len(checks['long_sentences'])} sentences are longer than {LONG_SENTENCE_WORDS} words "
+            f"and may be hard to follow</li>"
+        )
+
+    return (
+        '<div class="local-checks">'
+        f'<h2>Grammar &amp; Spelling</h2>{grammar}'
+        f'<h2>Readability</h2><ul>{"".join(readability_items)}</ul>'
+        '</div>'
+    )
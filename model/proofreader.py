@@ -0,0 +1,188 @@
+from django.utils.html import escape
+from model.compression import minify_html
+from model.llm import get_groq_client, create_chat_completion
+from model.documents import DocumentReadError
+from model.profiles import get_document_profile
+from model.proofcheck import run_local_checks, render_local_report, describe_finding
+from model.revisions import (
+    split_paragraphs,
+    paragraph_digest,
+    find_previous_revision,
+    changed_paragraphs,
+    parse_paragraph_reviews,
+    save_revision,
+    revision_mode_enabled
+)
+
+MAX_PROMPT_CORRECTIONS = 40  # Local findings passed to the LLM for the enhanced version
+MAX_CHANGED_RATIO = 0.5  # Revisions changing more paragraphs than this are proofread in full
+MAX_CHANGED_CHARACTERS = 12000  # Changed text reviewed in one incremental call
+
+
+def _checked_by_tools(spell_check):
+    # Without a dictionary the local checks cannot find misspellings, so the LLM keeps that job
+    if spell_check:
+        return "Spelling, mechanical grammar and readability statistics are checked by separate tools"
+    return "Mechanical grammar and readability statistics are checked by separate tools, but spelling is not"
+
+
+def _full_review(client, document_type, text, corrections, spell_check):
+    # Create a system prompt for the proofreading
+    system_prompt = f"""You are Myne, an advanced AI document proofreader assistant.
+    Your task is to provide analysis and suggestions for improving the document.
+    {_checked_by_tools(spell_check)}; focus on {"" if spell_check else "spelling, "}tone, style, clarity, structure and coherence.
+    Provide your feedback in a structured HTML format with clear sections and highlighting of issues."""
+    
+    sections = [
+        "SUMMARY: A brief overview of the document and its main issues",
+        "STYLE & TONE: Analyze the writing style and tone, suggesting improvements",
+        "STRUCTURE & COHERENCE: Evaluate the document's structure and flow",
+        "ENHANCED VERSION: Provide an improved version of the document that also fixes the issues above",
+    ]
+    if not spell_check:
+        sections.insert(1, "SPELLING: List every misspelled word with its correction")
+    analysis_format = "\n    ".join(f"{number}. {section}" for number, section in enumerate(sections, 1))
+
+    # Create a prompt for the proofreading
+    proofread_prompt = f"""
+    Please perform a detailed analysis of the following {document_type} document:
+
+    {text[:15000]}  # Increased content size limit
+
+    Automated checks already reported these issues (do not list them again):
+    {corrections}
+
+    Provide your analysis in the following format:
+
+    {analysis_format}
+
+    Format your response in HTML with appropriate headings, lists, and highlighting of issues.
+    """
+
+    return create_chat_completion(
+        client,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": proofread_prompt}
+        ],
+        model="llama3-70b-8192",
+        temperature=0.3,
+        max_tokens=3000
+    )
+
+
+def _incremental_review(client, document_type, paragraphs, indexes, spell_check):
+    changed = "\n\n".join(f"[[PARAGRAPH {index + 1}]]\n{paragraphs[index]}" for index in indexes)
+    
+    system_prompt = f"""You are Myne, an advanced AI document proofreader assistant.
+    You review the paragraphs a writer changed in a new revision of a document you proofread before.
+    {_checked_by_tools(spell_check)}; focus on {"" if spell_check else "spelling, "}tone, style, clarity and coherence."""
+    
+    revision_prompt = f"""
+    These paragraphs of a {document_type} document changed since the previous revision:
+    
+    {changed}
+    
+    For each paragraph, start with its marker line exactly as given (for example [[PARAGRAPH 3]]),
+    then give a short HTML review of its {"" if spell_check else "spelling, "}style, tone and clarity followed by an improved version.
+    """
+    
+    response = create_chat_completion(
+        client,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": revision_prompt}
+        ],
+        model="llama3-70b-8192",
+        temperature=0.3,
+        max_tokens=2000
+    )
+    return parse_paragraph_reviews(response, set(indexes))
+
+
+def _render_revision_report(base_report, paragraphs, digests, findings, changed):
+    reviews = []
+    for index, digest in enumerate(digests):
+        if digest in findings and findings[digest]:
+            status = "changed" if index in changed else "reviewed in an earlier revision"
+            reviews.append(
+                f'<div class="paragraph-review"><h3>Paragraph {index + 1} ({status})</h3>'
+                f'<blockquote>{escape(paragraphs[index][:300])}</blockquote>{findings[digest]}</div>'
+            )
+    return (
+        '<div class="revision-review"><h2>Revision Review</h2>'
+        f'<p>{len(changed)} of {len(digests)} paragraphs changed since the previous version; '
+        'only those were proofread again.</p>'
+        f'{"".join(reviews)}</div>'
+        '<div class="previous-review"><h2>Overall Review</h2>'
+        '<p><em>From the last full proofread of this document.</em></p>'
+        f'{base_report}</div>'
+    )
+
+
+# Document Proofreader utility
+def proofread_document(file_path, client_id=None, filename=None):
+    try:
+        client = get_groq_client()
+        
+        # Read the document content from its precomputed profile
+        try:
+            profile = get_document_profile(file_path)
+        except DocumentReadError as e:
+            return f"<div class='error-message'>{str(e)}</div>"
+        
+        try:
+            document_type = profile['document_type']
+            
+            # Mechanical checks run locally, so the LLM only covers style, tone and structure
+            local_checks = run_local_checks(profile['text'])
+            local_report = render_local_report(local_checks, profile['readability'])
+            corrections = "\n".join(
+                f"- Line {finding['line']}: {describe_finding(finding)}"
+                for finding in local_checks['findings'][:MAX_PROMPT_CORRECTIONS]
+            ) or "- None found"
+            
+            paragraphs = split_paragraphs(profile['text'])
+            digests = [paragraph_digest(paragraph) for paragraph in paragraphs]
+            
+            # Revisions of a document proofread before only get their changed paragraphs reviewed
+            previous = None
+            if client_id and revision_mode_enabled():
+                previous = find_previous_revision(client_id, filename, digests)
+            changed = changed_paragraphs(digests, previous) if previous else None
+            
+            if changed is not None and len(changed) <= len(digests) * MAX_CHANGED_RATIO and \
+                    sum(len(paragraphs[index]) for index in changed) <= MAX_CHANGED_CHARACTERS:
+                reviews = _incremental_review(
+                    client, document_type, paragraphs, changed, local_checks['spell_check']
+                ) if changed else {}
+                findings = {digest: previous.findings[digest] for digest in digests if digest in previous.findings}
+                findings.update({digests[index]: review for index, review in reviews.items()})
+                save_revision(client_id, filename, digests, previous.base_report, previous.base_paragraphs, findings)
+                proofreading_result = _render_revision_report(
+                    previous.base_report, paragraphs, digests, findings, set(changed)
+                )
+            else:
+                proofreading_result = _full_review(
+                    client, document_type, profile['text'], corrections, local_checks['spell_check']
+                )
+                if client_id and revision_mode_enabled():
+                    save_revision(client_id, filename, digests, proofreading_result, digests, {})
+            
+            # Format the result with HTML for better display
+            formatted_result = f"""
+            <div class="proofreading-result">
+                {local_report}
+                {proofreading_result}
+            </div>
+            """
+            
+            return minify_html(formatted_result)
+        except Exception as e:
+            return f"<div class='error-message'>Error proofreading document: {str(e)}</div>"
+    except ValueError as e:
+        # Handle missing API key
+        return f"<div class='error-message'>Configuration Error: {str(e)}</div>"
+    except Exception as e:
+        # Handle other errors
+        return f"<div class='error-message'>Sorry, I encountered an error: {str(e)}</div>"
@@ -0,0 +1,72 @@
+from model.compression import minify_html
+from model.llm import get_groq_client, create_chat_completion
+from model.documents import DocumentReadError
+from model.profiles import get_document_profile, select_chunks
+
+# RAG System utility
+def process_document_for_rag(file_path, query):
+    try:
+        client = get_groq_client()
+        
+        # Read the document content from its precomputed profile
+        try:
+            profile = get_document_profile(file_path)
+        except DocumentReadError as e:
+            return f"<div class='error-message'>{str(e)}</div>"
+        
+        try:
+            document_type = profile['document_type']
+            
+            # Create a system prompt for the RAG system
+            system_prompt = """You are Sirius, an advanced AI document analysis assistant.
+            Your task is to provide comprehensive and accurate answers to questions based on the document content.
+            If the answer isn't in the document, acknowledge that rather than making up information.
+            Format your responses with proper HTML for better readability, including headings, lists, and highlighting of important information.
+            Include relevant quotes from the document to support your answers."""
+            
+            # Create a prompt for the RAG system
+            rag_prompt = f"""
+            Document Type: {document_type}
+            
+            Document Content:
+            {select_chunks(profile, query, 20000)}  # Most relevant chunks up to the content size limit
+            
+            User Question: {query}
+            
+            Please provide a comprehensive answer to the question based solely on the document content.
+            Format your response with the following sections:
+            1. Direct Answer: A concise answer to the question
+            2. Supporting Evidence: Relevant quotes from the document that support your answer
+            3. Additional Context: Any additional information from the document that might be helpful
+            4. Related Information: Other relevant information from the document that relates to the question
+            
+            Use proper HTML formatting for better readability.
+            """
+            
+            rag_result = create_chat_completion(
+                client,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": rag_prompt}
+                ],
+                model="llama3-70b-8192",
+                temperature=0.3,
+                max_tokens=3000
+            )
+            
+            # Format the result with HTML for better display
+            formatted_result = f"""
+            <div class="rag-result">
+                {rag_result}
+            </div>
+            """
+            
+            return minify_html(formatted_result)
+        except Exception as e:
+            return f"<div class='error-message'>Document processing error: {str(e)}</div>"
+    except ValueError as e:
+        # Handle missing API key
+        return f"<div class='error-message'>Configuration Error: {str(e)}</div>"
+    except Exception as e:
+        # Handle other errors
+        return f"<div class='error-message'>Sorry, I encountered an error: {str(e)}</div>"
@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import hashlib
+from types import SimpleNamespace
+from django.conf import settings
+
+LIVE, RECORD, REPLAY = 'live', 'record', 'replay'
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode when no recording exists for a request."""
+
+
+def io_mode():
+    # The environment variable wins so benchmark runs can switch modes without editing settings
+    mode = os.environ.get('QUADRANEX_IO_MODE') or getattr(settings, 'IO_MODE', LIVE)
+    if mode not in (LIVE, RECORD, REPLAY):
+        raise ValueError(f"Unknown IO mode: {mode}")
+    return mode
+
+
+def _fixture_path(kind, request):
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    key = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    directory = getattr(settings, 'IO_FIXTURES_DIR', os.path.join(settings.BASE_DIR, 'fixtures', 'io'))
+    return os.path.join(directory, kind, f'{key}.json')
+
+
+def _load(kind, request):
+    path = _fixture_path(kind, request)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise ReplayMissError(f"No recorded {kind} response for this request ({os.path.basename(path)})")
+
+
+def _save(kind, request, recording):
+    path = _fixture_path(kind, request)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'request': request, **recording}, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def _simulate_timing():
+    return bool(os.environ.get('QUADRANEX_IO_REPLAY_TIMING')) or getattr(settings, 'IO_REPLAY_TIMING', False)
+
+
+def recorded(kind, request, fn):
+    """Run fn() live, record its JSON-serialisable result, or replay a recording, depending on io_mode()."""
+    mode = io_mode()
+    if mode == REPLAY:
+        recording = _load(kind, request)
+        if _simulate_timing():
+            time.sleep(recording['elapsed'])
+        return recording['response']
+
+    start = time.perf_counter()
+    response = fn()
+    if mode == RECORD:
+        _save(kind, request, {'response': response, 'elapsed': time.perf_counter() - start})
+    return response
+
+
+def _completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _chunk(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class _Completions:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, stream=False, **params):
+        request = {'stream': stream, **params}
+        if stream:
+            return self._stream(request, params)
+        content = recorded(
+            'groq', request,
+            lambda: self._client.chat.completions.create(**params).choices[0].message.content
+        )
+        return _completion(content)
+
+    def _stream(self, request, params):
+        if io_mode() == REPLAY:
+            recording = _load('groq', request)
+            simulate = _simulate_timing()
+            start = time.perf_counter()
+            for offset, content in recording['chunks']:
+                if simulate:
+                    time.sleep(max(0, offset - (time.perf_counter() - start)))
+                yield _chunk(content)
+            return
+
+        # Record each chunk with its offset from the start of the call
+        chunks = []
+        start = time.perf_counter()
+        for chunk in self._client.chat.completions.create(stream=True, **params):
+            content = chunk.choices[0].delta.content if chunk.choices else None
+            chunks.append([time.perf_counter() - start, content])
+            yield chunk
+        if io_mode() == RECORD:
+            _save('groq', request, {'chunks': chunks, 'elapsed': time.perf_counter() - start})
+
+
+class RecordingClient:
+    """Stand-in for the Groq client that records or replays chat completions.
+
+    Only `chat.completions.create` is supported, which is all the app uses.
+    In replay mode no real client (and no API key) is needed.
+    """
+
+    def __init__(self, client=None):
+        self.chat = SimpleNamespace(completions=_Completions(client))
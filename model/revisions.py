@@ -0,0 +1,93 @@
+import re
+import hashlib
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+
+MATCH_THRESHOLD = 0.5  # Paragraph overlap needed to match an upload with a different name
+NAME_MATCH_THRESHOLD = 0.2  # Paragraph overlap still needed when the name matches
+RECENT_REVISIONS = 10  # Revisions kept and compared per client
+
+PARAGRAPH_MARKER_RE = re.compile(r'\[\[PARAGRAPH (\d+)\]\]')
+
+
+def split_paragraphs(text):
+    # Blank lines separate paragraphs in text files; DOCX and PDF text has one paragraph per line
+    blocks = re.split(r'\n\s*\n', text)
+    if len(blocks) == 1:
+        blocks = text.splitlines()
+    return [block.strip() for block in blocks if block.strip()]
+
+
+def paragraph_digest(paragraph):
+    normalized = ' '.join(paragraph.split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def similarity(digests, other_digests):
+    digests, other_digests = set(digests), set(other_digests)
+    if not digests or not other_digests:
+        return 0.0
+    return len(digests & other_digests) / len(digests | other_digests)
+
+
+def find_previous_revision(client_key, original_name, digests):
+    """Find the version a new upload revises: same client, and the same name or mostly the same paragraphs.
+
+    A same-named upload still has to share some paragraphs, so an unrelated document
+    that happens to reuse a name is proofread in full.
+    """
+    from model.models import ProofreadRevision
+
+    recent = list(ProofreadRevision.objects.filter(client_key=client_key).order_by('-created_at')[:RECENT_REVISIONS])
+    for revision in recent:
+        if revision.original_name == original_name and similarity(digests, revision.paragraphs) >= NAME_MATCH_THRESHOLD:
+            return revision
+
+    best = max(recent, key=lambda revision: similarity(digests, revision.paragraphs), default=None)
+    if best is not None and similarity(digests, best.paragraphs) >= MATCH_THRESHOLD:
+        return best
+    return None
+
+
+def changed_paragraphs(digests, previous):
+    """Indexes of paragraphs not covered by the previous revision's report or findings."""
+    covered = set(previous.base_paragraphs) | set(previous.findings)
+    return [index for index, digest in enumerate(digests) if digest not in covered]
+
+
+def parse_paragraph_reviews(response, indexes):
+    """Split an LLM response on [[PARAGRAPH n]] markers into {paragraph index: review html}."""
+    reviews = {}
+    parts = PARAGRAPH_MARKER_RE.split(response)
+    # parts = [preamble, number, review, number, review, ...]
+    for number, review in zip(parts[1::2], parts[2::2]):
+        index = int(number) - 1
+        if index in indexes:
+            reviews[index] = review.strip()
+    return reviews
+
+
+def save_revision(client_key, original_name, digests, base_report, base_paragraphs, findings):
+    from model.models import ProofreadRevision
+
+    ProofreadRevision.objects.create(
+        client_key=client_key,
+        original_name=original_name,
+        paragraphs=digests,
+        base_report=base_report,
+        base_paragraphs=base_paragraphs,
+        findings=findings,
+    )
+
+    # Keep only the most recent revisions of each client
+    stale = ProofreadRevision.objects.filter(client_key=client_key).order_by('-created_at')[RECENT_REVISIONS:]
+    ProofreadRevision.objects.filter(pk__in=list(stale.values_list('pk', flat=True))).delete()
+
+    # Drop revisions of every client once their browser session has long expired
+    max_age = getattr(settings, 'PROOFREADER_REVISION_MAX_AGE_SECONDS', 14 * 24 * 60 * 60)
+    ProofreadRevision.objects.filter(created_at__lt=timezone.now() - timedelta(seconds=max_age)).delete()
+
+
+def revision_mode_enabled():
+    return getattr(settings, 'PROOFREADER_REVISION_MODE', True)
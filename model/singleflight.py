@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import threading
+from django.conf import settings
+
+
+class _Call:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.finished = False
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse identical concurrent calls into one upstream call.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is in flight wait for and share its result. With
+    SINGLE_FLIGHT_CROSS_PROCESS enabled, leaders in different workers also
+    coordinate through a file lock; the result is only shared with workers
+    that were waiting for it, it is never served to later calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def _join(self, key):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def _finish(self, key, call, result=None, error=None):
+        with self._lock:
+            self._calls.pop(key, None)
+        with call.condition:
+            call.result = result
+            call.error = error
+            call.finished = True
+            call.condition.notify_all()
+
+    def do(self, key, fn):
+        call, leader = self._join(key)
+        if not leader:
+            with call.condition:
+                call.condition.wait_for(lambda: call.finished)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if getattr(settings, 'SINGLE_FLIGHT_CROSS_PROCESS', False):
+                result = _shared_call(key, fn)
+            else:
+                result = fn()
+        except Exception as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result=result)
+        return result
+
+
+def _shared_call(key, fn):
+    # Cross-worker coordination: the worker that takes the lock without waiting calls
+    # upstream; workers that find it held wait, then reuse the result if it finished
+    # after they arrived. Sequential calls never wait, so they still go upstream.
+    from filelock import FileLock, Timeout
+
+    directory = getattr(settings, 'SINGLE_FLIGHT_DIR', os.path.join(settings.BASE_DIR, 'cache', 'singleflight'))
+    timeout = getattr(settings, 'SINGLE_FLIGHT_LOCK_TIMEOUT', 120)
+    os.makedirs(directory, exist_ok=True)
+    result_path = os.path.join(directory, f'{key}.json')
+    lock = FileLock(os.path.join(directory, f'{key}.lock'))
+    arrived = time.time()
+
+    try:
+        lock.acquire(timeout=0)
+    except Timeout:
+        lock.acquire(timeout=timeout)
+        try:
+            with open(result_path, 'r', encoding='utf-8') as f:
+                shared = json.load(f)
+            if shared['finished'] >= arrived:
+                lock.release()
+                return shared['result']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    # Either no call was in flight, or the one we waited for failed without a result
+    try:
+        result = fn()
+        tmp_path = f'{result_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'finished': time.time(), 'result': result}, f)
+        os.replace(tmp_path, result_path)
+    finally:
+        lock.release()
+
+    # Callers give up after the lock timeout, so older results can no longer be shared
+    _prune_results(directory, timeout)
+    return result
+
+
+def _prune_results(directory, max_age):
+    now = time.time()
+    for entry in os.scandir(directory):
+        try:
+            age = now - entry.stat().st_mtime
+            # Lock files are kept far longer than any call so a held lock is never removed
+            if (entry.name.endswith('.json') and age > max_age) or (entry.name.endswith('.lock') and age > 3600):
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+# Shared instance used for all LLM calls in this process
+llm_flight = SingleFlight()
@@ -0,0 +1,211 @@
+import os
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = 'uploads'
+
+_scheduler_lock = threading.Lock()
+_scheduler_thread = None
+
+
+def _upload_path(content_hash, name):
+    # Shard by hash prefix so directories stay small and names never collide
+    return f'{UPLOAD_DIR}/{content_hash[:2]}/{content_hash[:16]}_{name}'
+
+
+# Save an uploaded file, reusing an identical earlier upload when possible.
+# With pin=True the upload is returned pinned; the caller must unpin_upload() it when done.
+def store_upload(file, pin=False):
+    from model.models import StoredUpload
+
+    data = file.read()
+    name = os.path.basename(file.name)
+    content_hash = hashlib.sha256(data).hexdigest()
+    path = _upload_path(content_hash, name)
+
+    # Pin an existing record before checking its file, so GC cannot delete it in between
+    now = timezone.now()
+    reused = StoredUpload.objects.filter(path=path).update(
+        last_accessed=now, **({'pin_count': F('pin_count') + 1, 'pinned_at': now} if pin else {})
+    )
+    if reused and default_storage.exists(path):
+        upload = StoredUpload.objects.get(path=path)
+    else:
+        if not default_storage.exists(path):
+            saved_path = default_storage.save(path, ContentFile(data))
+            if saved_path != path:
+                # A concurrent upload of the same bytes saved the file first; use its copy
+                default_storage.delete(saved_path)
+        defaults = {
+            'original_name': name,
+            'content_hash': content_hash,
+            'size': len(data),
+            'last_accessed': now,
+        }
+        upload, created = StoredUpload.objects.update_or_create(
+            path=path,
+            defaults=defaults,
+            create_defaults={**defaults, 'pin_count': int(pin), 'pinned_at': now if pin else None}
+        )
+        if pin and not created and not reused:
+            # The record was created concurrently after the pin above found nothing
+            pin_upload(path)
+            upload.refresh_from_db()
+
+    ensure_gc_scheduler()
+    return upload
+
+
+def touch_upload(path):
+    from model.models import StoredUpload
+    StoredUpload.objects.filter(path=path).update(last_accessed=timezone.now())
+
+
+def pin_upload(path):
+    from model.models import StoredUpload
+    StoredUpload.objects.filter(path=path).update(pin_count=F('pin_count') + 1, pinned_at=timezone.now())
+
+
+def unpin_upload(path):
+    from model.models import StoredUpload
+    StoredUpload.objects.filter(path=path, pin_count__gt=0).update(pin_count=F('pin_count') - 1)
+
+
+def unpinned_uploads():
+    """Uploads that are not pinned, or whose pins are too old to belong to a live request."""
+    from model.models import StoredUpload
+
+    timeout = getattr(settings, 'UPLOAD_PIN_TIMEOUT_SECONDS', 60 * 60)
+    stale = timezone.now() - timedelta(seconds=timeout)
+    return StoredUpload.objects.filter(Q(pin_count=0) | Q(pinned_at__lt=stale) | Q(pinned_at__isnull=True))
+
+
+def relative_upload_path(full_path):
+    return os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+
+
+# Remove an upload and its tracking record unless it is pinned; returns whether it was removed
+def discard_upload(path):
+    deleted, _ = unpinned_uploads().filter(path=path).delete()
+    if not deleted:
+        return False
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    return True
+
+
+# Track files that were saved before the lifecycle manager existed
+def adopt_untracked_uploads():
+    from model.models import StoredUpload
+
+    root = os.path.join(settings.MEDIA_ROOT, UPLOAD_DIR)
+    tracked = set(StoredUpload.objects.values_list('path', flat=True))
+    adopted = 0
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            full_path = os.path.join(dirpath, filename)
+            path = relative_upload_path(full_path)
+            if path in tracked:
+                continue
+            with open(full_path, 'rb') as f:
+                content_hash = hashlib.sha256(f.read()).hexdigest()
+            stat = os.stat(full_path)
+            StoredUpload.objects.create(
+                path=path,
+                original_name=filename,
+                content_hash=content_hash,
+                size=stat.st_size,
+                last_accessed=datetime.fromtimestamp(stat.st_mtime, tz=dt_timezone.utc),
+            )
+            adopted += 1
+    return adopted
+
+
+def collect_garbage(max_age=None, quota_bytes=None, dry_run=False):
+    """Delete expired uploads, then least recently used ones until under quota.
+
+    Pinned uploads are skipped unless their pins have expired. Returns a dict of collection statistics.
+    """
+    from model.models import StoredUpload
+
+    if max_age is None:
+        max_age = getattr(settings, 'UPLOAD_MAX_AGE_SECONDS', None)
+    if quota_bytes is None:
+        quota_bytes = getattr(settings, 'UPLOAD_QUOTA_BYTES', None)
+
+    stats = {'deleted': 0, 'freed_bytes': 0, 'missing': 0}
+    deleted = set()
+
+    def delete(upload):
+        # An upload pinned since it was listed is skipped by discard_upload
+        if not dry_run and not discard_upload(upload.path):
+            return False
+        deleted.add(upload.pk)
+        stats['deleted'] += 1
+        stats['freed_bytes'] += upload.size
+        return True
+
+    # Records whose file has disappeared are dropped regardless of pins
+    for upload in StoredUpload.objects.all().only('pk', 'path', 'size'):
+        if not default_storage.exists(upload.path):
+            deleted.add(upload.pk)
+            stats['missing'] += 1
+            if not dry_run:
+                upload.delete()
+
+    unpinned = unpinned_uploads().exclude(pk__in=deleted)
+
+    if max_age:
+        cutoff = timezone.now() - timedelta(seconds=max_age)
+        for upload in unpinned.filter(last_accessed__lt=cutoff):
+            delete(upload)
+
+    if quota_bytes:
+        remaining = StoredUpload.objects.exclude(pk__in=deleted).aggregate(total=Sum('size'))['total'] or 0
+        for upload in unpinned.exclude(pk__in=deleted).order_by('last_accessed'):
+            if remaining <= quota_bytes:
+                break
+            if delete(upload):
+                remaining -= upload.size
+
+    stats['total_bytes'] = StoredUpload.objects.exclude(pk__in=deleted).aggregate(total=Sum('size'))['total'] or 0
+    return stats
+
+
+def _gc_loop(interval):
+    stop = threading.Event()
+    while not stop.wait(interval):
+        try:
+            close_old_connections()
+            stats = collect_garbage()
+            if stats['deleted']:
+                logger.info("Upload GC removed %(deleted)s files (%(freed_bytes)s bytes)", stats)
+        except Exception:
+            logger.exception("Upload GC failed")
+        finally:
+            close_old_connections()
+
+
+# Start the in-process GC thread once, if UPLOAD_GC_INTERVAL_SECONDS is configured
+def ensure_gc_scheduler():
+    global _scheduler_thread
+
+    interval = getattr(settings, 'UPLOAD_GC_INTERVAL_SECONDS', 0)
+    if not interval or _scheduler_thread is not None:
+        return
+    with _scheduler_lock:
+        if _scheduler_thread is None:
+            _scheduler_thread = threading.Thread(
+                target=_gc_loop, args=(interval,), name='upload-gc', daemon=True
+            )
+            _scheduler_thread.start()
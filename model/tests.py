@@ -1,3 +1,863 @@
-from django.test import TestCase
+import os
+import gzip
+import json
+import re
+import shutil
+import hashlib
+import tempfile
+import threading
+import time
+import zlib
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from model import proofreader, replay, wikipedia
+from model.compression import minify_html, accepts_brotli, CompressionMiddleware
+from model.documents import handle_uploaded_file
+from model.middleware import TokenBuckets, FairScheduler, AdmissionControlMiddleware
+from model.models import WikipediaSectionSummary, StoredUpload, DocumentProfile, ProofreadRevision
+from model.profiles import (
+    schedule_profile, get_document_profile, split_chunks, index_terms, select_chunks, readability_stats
+)
+from model.proofcheck import rule_findings, run_local_checks, load_dictionary
+from model.revisions import paragraph_digest, find_previous_revision, save_revision, parse_paragraph_reviews
+from model.singleflight import SingleFlight
+from model.storage import store_upload, pin_upload, unpin_upload, discard_upload, collect_garbage
 
-# Create your tests here.
+
+class WikipediaSummaryTests(TestCase):
+    url = "https://en.wikipedia.org/wiki/Example"
+
+    def summarize(self, sections):
+        prompts = []
+
+        def completion(client, prompt, max_tokens):
+            prompts.append(prompt)
+            return f"summary {len(prompts)}"
+
+        with mock.patch.object(wikipedia, 'get_groq_client'), \
+                mock.patch.object(wikipedia, '_summary_completion', side_effect=completion):
+            wikipedia.summarize_wikipedia_article(self.url, "Example", "x" * 6000, sections)
+        # The last prompt is the final reduce step
+        return prompts[:-1]
+
+    def test_oversized_sections_are_split_not_truncated(self):
+        text = "\n".join(f"Paragraph {i} " + "word " * 60 for i in range(60))
+        parts = wikipedia.split_sections([{"title": "History", "text": text}, {"title": "Empty", "text": " "}])
+        self.assertGreater(len(parts), 1)
+        self.assertTrue(all(len(part["text"]) <= wikipedia.SECTION_TEXT_LIMIT for part in parts))
+        self.assertEqual("".join(part["text"] for part in parts), text.strip())
+        self.assertEqual(parts[1]["title"], "History (part 2)")
+
+    def test_refresh_only_resummarises_changed_sections(self):
+        sections = [{"title": f"Section {i}", "text": f"Section {i} text. " * 40} for i in range(4)]
+        self.assertEqual(len(self.summarize(sections)), 4)
+        self.assertEqual(WikipediaSectionSummary.objects.filter(article_url=self.url).count(), 4)
+
+        sections[2] = {"title": "Section 2", "text": "Edited section text. " * 40}
+        prompts = self.summarize(sections)
+        self.assertEqual(len(prompts), 1)
+        self.assertIn("Edited section text.", prompts[0])
+        self.assertEqual(WikipediaSectionSummary.objects.filter(article_url=self.url).count(), 4)
+
+    def test_reduce_input_stays_bounded_for_many_sections(self):
+        sections = [{"title": f"Section {i}", "text": f"Section {i} text. " * 40} for i in range(150)]
+        prompts = []
+
+        def completion(client, prompt, max_tokens):
+            prompts.append(prompt)
+            # Section summaries near their 200-token cap
+            return "summary " * 100
+
+        with mock.patch.object(wikipedia, 'get_groq_client'), \
+                mock.patch.object(wikipedia, '_summary_completion', side_effect=completion):
+            wikipedia.summarize_wikipedia_article(self.url, "Example", "x" * 6000, sections)
+        self.assertGreater(len(prompts), 151)  # Sections, combine steps and the final reduce
+        self.assertLess(max(len(prompt) for prompt in prompts), wikipedia.REDUCE_INPUT_LIMIT + 1000)
+        self.assertIn("Section summaries:", prompts[-1])
+
+    def test_group_summaries_respects_limit_and_order(self):
+        entries = [(f"Section {i}", "x" * 300) for i in range(50)]
+        groups = wikipedia.group_summaries(entries, limit=1000)
+        self.assertEqual([entry for group in groups for entry in group], entries)
+        for group in groups:
+            self.assertLessEqual(len("\n\n".join(f"{title}:\n{summary}" for title, summary in group)), 1000)
+
+    def test_successful_sections_are_kept_when_one_fails(self):
+        sections = [{"title": f"Section {i}", "text": f"Section {i} text. " * 40} for i in range(4)]
+
+        def completion(client, prompt, max_tokens):
+            if "Section 2 text." in prompt:
+                raise RuntimeError("rate limited")
+            return "summary"
+
+        with mock.patch.object(wikipedia, 'get_groq_client'), \
+                mock.patch.object(wikipedia, '_summary_completion', side_effect=completion):
+            with self.assertRaises(RuntimeError):
+                wikipedia.summarize_wikipedia_article(self.url, "Example", "x" * 6000, sections)
+        stored = set(WikipediaSectionSummary.objects.values_list('section_title', flat=True))
+        self.assertEqual(stored, {"Section 0", "Section 1", "Section 3"})
+        self.assertEqual(len(self.summarize(sections)), 1)
+
+
+# Section summaries are produced on worker threads, which need committed data
+class WikipediaConcurrentRefreshTests(TransactionTestCase):
+    url = WikipediaSummaryTests.url
+
+    def test_sections_stored_by_a_concurrent_refresh_are_kept(self):
+        sections = [{"title": "Section", "text": "Some section text. " * 40}]
+        section_text = wikipedia.split_sections(sections)[0]["text"]
+        section_hash = hashlib.sha256(section_text.encode("utf-8")).hexdigest()
+
+        def completion(client, prompt, max_tokens):
+            # Another request finishes summarising the same section meanwhile
+            WikipediaSectionSummary.objects.get_or_create(
+                article_url=self.url, section_title="Section", content_hash=section_hash,
+                defaults={"summary": "stored concurrently"}
+            )
+            return "summary"
+
+        with mock.patch.object(wikipedia, 'get_groq_client'), \
+                mock.patch.object(wikipedia, '_summary_completion', side_effect=completion):
+            wikipedia.summarize_wikipedia_article(self.url, "Example", "x" * 6000, sections)
+        self.assertEqual(WikipediaSectionSummary.objects.get().summary, "stored concurrently")
+
+
+class UploadStorageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, UPLOAD_GC_INTERVAL_SECONDS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def store(self, name, data, days_idle=0, pin=False):
+        upload = store_upload(ContentFile(data, name=name), pin=pin)
+        StoredUpload.objects.filter(pk=upload.pk).update(
+            last_accessed=timezone.now() - timedelta(days=days_idle)
+        )
+        return upload
+
+    def remaining(self):
+        return set(StoredUpload.objects.values_list('original_name', flat=True))
+
+    def test_identical_uploads_are_stored_once(self):
+        first = self.store('a.txt', b'same')
+        second = self.store('a.txt', b'same', pin=True)
+        self.assertEqual(first.path, second.path)
+        self.assertEqual(StoredUpload.objects.get().pin_count, 1)
+
+    def test_expired_uploads_are_deleted(self):
+        expired = self.store('old.txt', b'old', days_idle=10)
+        self.store('new.txt', b'new', days_idle=1)
+        stats = collect_garbage(max_age=5 * 24 * 3600, quota_bytes=0)
+        self.assertEqual(stats['deleted'], 1)
+        self.assertEqual(self.remaining(), {'new.txt'})
+        self.assertFalse(default_storage.exists(expired.path))
+
+    def test_quota_removes_least_recently_used_first(self):
+        for name, days_idle in (('b.txt', 2), ('a.txt', 3), ('c.txt', 1)):
+            self.store(name, name.encode() * 100, days_idle=days_idle)
+        stats = collect_garbage(max_age=0, quota_bytes=600)
+        self.assertEqual(stats['deleted'], 2)
+        self.assertEqual(self.remaining(), {'c.txt'})
+
+    def test_dry_run_deletes_nothing(self):
+        self.store('old.txt', b'old', days_idle=10)
+        stats = collect_garbage(max_age=3600, quota_bytes=0, dry_run=True)
+        self.assertEqual(stats['deleted'], 1)
+        self.assertEqual(self.remaining(), {'old.txt'})
+
+    def test_pinned_uploads_are_kept_until_unpinned(self):
+        pinned = self.store('pinned.txt', b'x' * 2000, days_idle=10, pin=True)
+        collect_garbage(max_age=3600, quota_bytes=10)
+        self.assertEqual(self.remaining(), {'pinned.txt'})
+        self.assertTrue(default_storage.exists(pinned.path))
+
+        unpin_upload(pinned.path)
+        collect_garbage(max_age=3600, quota_bytes=10)
+        self.assertEqual(self.remaining(), set())
+
+    def test_pins_leaked_by_dead_workers_expire(self):
+        leaked = self.store('leaked.txt', b'leaked', days_idle=10, pin=True)
+        with override_settings(UPLOAD_PIN_TIMEOUT_SECONDS=3600):
+            collect_garbage(max_age=3600, quota_bytes=0)
+            self.assertEqual(self.remaining(), {'leaked.txt'})
+
+            StoredUpload.objects.filter(pk=leaked.pk).update(pinned_at=timezone.now() - timedelta(hours=2))
+            collect_garbage(max_age=3600, quota_bytes=0)
+            self.assertEqual(self.remaining(), set())
+
+    def test_concurrent_first_uploads_share_one_file(self):
+        first = self.store('race.txt', b'same bytes')
+        # The second upload checked for the file before the first one saved it
+        storage = mock.Mock(wraps=default_storage)
+        storage.exists.side_effect = [False, False]
+        with mock.patch('model.storage.default_storage', storage):
+            second = self.store('race.txt', b'same bytes', pin=True)
+        self.assertEqual(second.path, first.path)
+        self.assertEqual(StoredUpload.objects.get().pin_count, 1)
+        directory = os.path.dirname(default_storage.path(first.path))
+        self.assertEqual(os.listdir(directory), [os.path.basename(first.path)])
+
+    def test_upload_pinned_after_listing_is_not_discarded(self):
+        upload = self.store('busy.txt', b'busy')
+        pin_upload(upload.path)
+        self.assertFalse(discard_upload(upload.path))
+        self.assertTrue(default_storage.exists(upload.path))
+
+
+# The profile job reads the upload on an executor thread, which needs committed data
+class UploadPinningTests(TransactionTestCase):
+    def test_upload_stays_pinned_until_request_and_profile_job_finish(self):
+        with override_settings(MEDIA_ROOT=tempfile.mkdtemp(), UPLOAD_GC_INTERVAL_SECONDS=0):
+            self.addCleanup(shutil.rmtree, default_storage.location, ignore_errors=True)
+            file_info = handle_uploaded_file(ContentFile(b"Some text.", name='notes.txt'))
+            upload = StoredUpload.objects.get(path=file_info['upload'])
+            self.assertGreaterEqual(upload.pin_count, 1)
+
+            get_document_profile(file_info['path'])
+            schedule_profile(file_info['path']).result()
+            unpin_upload(file_info['upload'])
+            self.assertEqual(StoredUpload.objects.get(pk=upload.pk).pin_count, 0)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def run_concurrently(self, callers):
+        results = [None] * len(callers)
+
+        def run(index):
+            try:
+                results[index] = callers[index]()
+            except Exception as e:
+                results[index] = e
+
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(len(callers))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def blocking_call(self, release, result=None, error=None):
+        calls = []
+
+        def call():
+            calls.append(1)
+            release.wait(5)
+            if error is not None:
+                raise error
+            return result
+        return call, calls
+
+    def test_identical_concurrent_calls_share_one_upstream_call(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        call, calls = self.blocking_call(release, result="answer")
+        threading.Timer(0.2, release.set).start()
+        results = self.run_concurrently([lambda: flight.do('key', call)] * 5)
+        self.assertEqual(results, ["answer"] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_errors_are_raised_in_every_waiter(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        call, calls = self.blocking_call(release, error=RuntimeError("upstream failed"))
+        threading.Timer(0.2, release.set).start()
+        results = self.run_concurrently([lambda: flight.do('key', call)] * 3)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    def test_sequential_calls_are_not_cached(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do('key', lambda: 1), 1)
+        self.assertEqual(flight.do('key', lambda: 2), 2)
+
+    def test_workers_share_only_calls_they_waited_for(self):
+        # Separate SingleFlight instances stand in for separate worker processes
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        with override_settings(SINGLE_FLIGHT_CROSS_PROCESS=True, SINGLE_FLIGHT_DIR=directory):
+            release = threading.Event()
+            call, calls = self.blocking_call(release, result="shared")
+            threading.Timer(0.3, release.set).start()
+            workers = [SingleFlight() for _ in range(3)]
+            results = self.run_concurrently([lambda worker=worker: worker.do('key', call) for worker in workers])
+            self.assertEqual(results, ["shared"] * 3)
+            self.assertEqual(len(calls), 1)
+
+            self.assertEqual(SingleFlight().do('key', lambda: "fresh"), "fresh")
+
+    def shared_directory(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings_override = override_settings(SINGLE_FLIGHT_CROSS_PROCESS=True, SINGLE_FLIGHT_DIR=directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        return directory
+
+    def test_worker_that_waited_reuses_result_of_call_in_flight(self):
+        from filelock import FileLock
+        directory = self.shared_directory()
+        # Another worker has taken the lock but not yet called upstream
+        lock = FileLock(os.path.join(directory, 'key.lock'))
+        lock.acquire()
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(SingleFlight().do('key', lambda: "duplicate")))
+        waiter.start()
+        time.sleep(0.2)
+        with open(os.path.join(directory, 'key.json'), 'w', encoding='utf-8') as f:
+            json.dump({'finished': time.time(), 'result': "shared"}, f)
+        lock.release()
+        waiter.join(5)
+        self.assertEqual(results, ["shared"])
+
+    def test_worker_calls_upstream_when_the_call_it_waited_for_failed(self):
+        from filelock import FileLock
+        directory = self.shared_directory()
+        with open(os.path.join(directory, 'key.json'), 'w', encoding='utf-8') as f:
+            json.dump({'finished': time.time() - 60, 'result': "stale"}, f)
+        lock = FileLock(os.path.join(directory, 'key.lock'))
+        lock.acquire()
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(SingleFlight().do('key', lambda: "fresh")))
+        waiter.start()
+        time.sleep(0.2)
+        lock.release()
+        waiter.join(5)
+        self.assertEqual(results, ["fresh"])
+
+
+class AdmissionControlTests(SimpleTestCase):
+    classes = {
+        'a': {'concurrency': 1, 'weight': 4, 'max_queue': 16},
+        'b': {'concurrency': 1, 'weight': 1, 'max_queue': 16},
+    }
+
+    def wait_for_queue(self, scheduler, endpoint_class, length):
+        deadline = time.monotonic() + 5
+        while len(scheduler._queues[endpoint_class]) < length and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def test_token_buckets_refill_and_report_retry_after(self):
+        buckets = TokenBuckets(rate=0.5, burst=2)
+        self.assertTrue(buckets.take('client')[0])
+        self.assertTrue(buckets.take('client')[0])
+        allowed, retry_after = buckets.take('client')
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 2, places=1)
+        self.assertTrue(buckets.take('other client')[0])
+
+    def test_invalid_limits_are_rejected(self):
+        with self.assertRaises(ValueError):
+            TokenBuckets(rate=0, burst=1)
+        for option, value in (('rate', 0), ('burst', 0), ('weight', 0), ('concurrency', 0), ('rtae', 1)):
+            config = {'ENABLED': True, 'CLASSES': {'chat': {'paths': ['/chat/'], option: value}}}
+            with self.subTest(option=option), override_settings(ADMISSION_CONTROL=config):
+                with self.assertRaises(ImproperlyConfigured):
+                    AdmissionControlMiddleware(lambda request: HttpResponse())
+
+    def test_waiting_requests_are_started_by_weight(self):
+        scheduler = FairScheduler(1, self.classes)
+        self.assertTrue(scheduler.acquire('a', 1))
+        order = []
+
+        def request(endpoint_class):
+            if scheduler.acquire(endpoint_class, 5):
+                order.append(endpoint_class)
+                scheduler.release(endpoint_class)
+
+        # Queue the requests one by one so their arrival order is fixed
+        threads = []
+        queued = {'a': 0, 'b': 0}
+        for endpoint_class in ['b'] * 2 + ['a'] * 8:
+            thread = threading.Thread(target=request, args=(endpoint_class,))
+            thread.start()
+            threads.append(thread)
+            queued[endpoint_class] += 1
+            self.wait_for_queue(scheduler, endpoint_class, queued[endpoint_class])
+        scheduler.release('a')
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(order, ['a'] * 4 + ['b'] + ['a'] * 4 + ['b'])
+
+    def test_timed_out_and_overflowing_requests_leave_the_queue(self):
+        scheduler = FairScheduler(1, {'a': {'concurrency': 1, 'weight': 1, 'max_queue': 1}})
+        self.assertTrue(scheduler.acquire('a', 1))
+        self.assertFalse(scheduler.acquire('a', 0.05))
+        self.assertEqual(len(scheduler._queues['a']), 0)
+
+        waiter = threading.Thread(target=scheduler.acquire, args=('a', 5))
+        waiter.start()
+        self.wait_for_queue(scheduler, 'a', 1)
+        self.assertFalse(scheduler.acquire('a', 5))  # Queue full, rejected without waiting
+        scheduler.release('a')
+        waiter.join(5)
+        self.assertEqual(scheduler._in_flight, 1)
+
+    def test_rate_limited_requests_get_retry_after(self):
+        config = {'ENABLED': True, 'CLASSES': {'chat': {'paths': ['/chat/'], 'rate': 0.1, 'burst': 1}}}
+        with override_settings(ADMISSION_CONTROL=config):
+            middleware = AdmissionControlMiddleware(lambda request: HttpResponse('ok'))
+        factory = RequestFactory()
+        self.assertEqual(middleware(factory.post('/chat/carmen/')).status_code, 200)
+        response = middleware(factory.post('/chat/carmen/'))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '10')
+        self.assertEqual(middleware(factory.post('/chat/carmen/', REMOTE_ADDR='10.0.0.2')).status_code, 200)
+
+
+class DocumentProfileTests(SimpleTestCase):
+    def profile(self, text, chunk_size):
+        chunks = split_chunks(text, chunk_size)
+        index = {}
+        for chunk_id, (start, end) in enumerate(chunks):
+            for term in set(index_terms(text[start:end])):
+                index.setdefault(term, []).append(chunk_id)
+        return {'text': text, 'chunks': chunks, 'index': index}
+
+    def test_split_chunks_covers_text_on_boundaries(self):
+        text = "\n".join(f"Paragraph {i} has a few words in it." for i in range(50))
+        chunks = split_chunks(text, 200)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(text))
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(text[end - 1], "\n")
+        self.assertTrue(all(end - start <= 200 for start, end in chunks))
+
+    def test_split_chunks_falls_back_to_spaces_and_hard_cuts(self):
+        spaced = "word " * 100
+        self.assertTrue(all(spaced[end - 1] == " " for _, end in split_chunks(spaced, 64)[:-1]))
+        unbroken = "x" * 250
+        self.assertEqual(split_chunks(unbroken, 100), [[0, 100], [100, 200], [200, 250]])
+        self.assertEqual(split_chunks("", 100), [])
+
+    def test_select_chunks_returns_short_documents_whole(self):
+        profile = self.profile("A short document.", 100)
+        self.assertEqual(select_chunks(profile, "anything", 1000), "A short document.")
+
+    def test_select_chunks_prefers_matching_chunks_within_limit(self):
+        paragraphs = [f"Filler paragraph number {i} about nothing much." for i in range(30)]
+        paragraphs[4] = "The introduction mentions nothing special here either."
+        paragraphs[20] = "Collisions are resolved with chaining in this hash table."
+        text = "\n".join(paragraphs)
+        profile = self.profile(text, 60)
+        selected = select_chunks(profile, "How are collisions resolved?", 200)
+        self.assertLessEqual(len(selected), 200)
+        self.assertTrue(selected.startswith(paragraphs[0]))
+        self.assertIn(paragraphs[20], selected)
+        # Chunks keep their document order
+        self.assertLess(selected.index(paragraphs[0]), selected.index(paragraphs[20]))
+
+
+# The upload view schedules the profile on an executor thread, which needs committed data
+class DocumentUploadViewTests(TransactionTestCase):
+    def test_upload_prepares_profile_for_later_questions(self):
+        with override_settings(MEDIA_ROOT=tempfile.mkdtemp(), ADMISSION_CONTROL={'ENABLED': False},
+                               UPLOAD_GC_INTERVAL_SECONDS=0):
+            self.addCleanup(shutil.rmtree, default_storage.location, ignore_errors=True)
+            response = self.client.post(
+                reverse('document_upload'), {'file': SimpleUploadedFile('notes.txt', b"Some notes.\n")}
+            )
+            self.assertEqual(response.status_code, 200)
+            upload = StoredUpload.objects.get()
+            schedule_profile(os.path.join(default_storage.location, upload.path)).result()
+            self.assertTrue(DocumentProfile.objects.filter(upload=upload).exists())
+            self.assertEqual(StoredUpload.objects.get().pin_count, 0)
+
+
+class ProofcheckRuleTests(SimpleTestCase):
+    def rules(self, text):
+        return [finding['rule'] for finding in rule_findings(text)]
+
+    def assertRule(self, rule, flagged, clean):
+        for text in flagged:
+            with self.subTest(text=text):
+                self.assertIn(rule, self.rules(text))
+        for text in clean:
+            with self.subTest(text=text):
+                self.assertNotIn(rule, self.rules(text))
+
+    def test_repeated_word(self):
+        self.assertRule('repeated-word', ["It was the the best.", "This This works."], ["It was the best."])
+
+    def test_space_before_punctuation(self):
+        self.assertRule('space-before-punctuation', ["Hello , world.", "Really ?"],
+                        ["Hello, world.", "Costs rose by .5 percent.", "Wait ..."])
+
+    def test_missing_space(self):
+        self.assertRule('missing-space', ["Hello,world.", "It ended.Then it began."],
+                        ["Hello, world.", "See example.com for details.", "It cost 3,000 dollars."])
+
+    def test_repeated_punctuation(self):
+        self.assertRule('repeated-punctuation', ["The end..", "Wait,, what", "Really?!"],
+                        ["The end.", "Wait...", "Really?"])
+
+    def test_multiple_spaces(self):
+        self.assertRule('multiple-spaces', ["Two  spaces here."], ["One space here.", "Line\n\nbreaks."])
+
+    def test_sentence_case(self):
+        self.assertRule('sentence-case', ["It works. and then it stops.", "Hello! world"],
+                        ["It works. And then it stops.", "Tools, books etc. and more.", "Use a hammer, i.e. a tool.",
+                         "See e.g. the docs.", "Red vs. blue.", "Made in the U.S. and sold abroad.",
+                         "We meet at 5 p.m. and then leave.", "It starts at 3 a.m. tomorrow.", "Ask Dr. smith.",
+                         "Mr. and Mrs. jones live on St. james street.", "See No. five."])
+
+    def test_lowercase_i(self):
+        self.assertRule('lowercase-i', ["Then i left.", "i think so."],
+                        ["Then I left.", "A hammer, i.e. a tool.", "See item (i) below.", "Step i) comes first.",
+                         "An iPhone and a wiki."])
+
+    def test_unbalanced_brackets_and_quotes(self):
+        self.assertRule('unbalanced', ["An (open bracket.", "A [list.", 'He said "hi.'],
+                        ["A (closed) bracket.", 'He said "hi."'])
+
+
+class ProofcheckSpellingTests(SimpleTestCase):
+    def setUp(self):
+        handle, path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(handle, 'w') as f:
+            f.write("the\ncat\nsat\non\nmat\nwalk\nquick\n")
+        self.addCleanup(os.remove, path)
+        settings_override = override_settings(PROOFREADER_DICTIONARY_PATH=path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        load_dictionary.cache_clear()
+        self.addCleanup(load_dictionary.cache_clear)
+
+    def test_misspellings_are_reported_with_suggestions(self):
+        checks = run_local_checks("The cat szt on the mat.\nThe cat walked quickly.")
+        self.assertTrue(checks['spell_check'])
+        spelling = [finding for finding in checks['findings'] if finding['rule'] == 'spelling']
+        self.assertEqual([finding['message'] for finding in spelling], ['Possible misspelling: "szt"'])
+        self.assertEqual(spelling[0]['suggestions'], ['sat'])
+        self.assertEqual(spelling[0]['line'], 1)
+
+    def test_missing_dictionary_disables_spell_check(self):
+        with override_settings(PROOFREADER_DICTIONARY_PATH=os.path.join(tempfile.gettempdir(), 'no-such-words')):
+            load_dictionary.cache_clear()
+            with self.assertLogs('model.proofcheck', 'WARNING'):
+                checks = run_local_checks("The cat szt on the mat.")
+        self.assertFalse(checks['spell_check'])
+        self.assertNotIn('spelling', [finding['rule'] for finding in checks['findings']])
+
+
+class ShippedDictionaryTests(SimpleTestCase):
+    def setUp(self):
+        load_dictionary.cache_clear()
+        self.addCleanup(load_dictionary.cache_clear)
+
+    def test_default_dictionary_ships_with_the_app(self):
+        checks = run_local_checks("The committee recieved the necessary documents yesterday.")
+        self.assertTrue(checks['spell_check'])
+        spelling = [finding['message'] for finding in checks['findings'] if finding['rule'] == 'spelling']
+        self.assertEqual(spelling, ['Possible misspelling: "recieved"'])
+
+
+class ProofreaderPromptTests(SimpleTestCase):
+    def prompts(self, spell_check):
+        with mock.patch.object(proofreader, 'create_chat_completion', return_value="review") as completion:
+            proofreader._full_review(None, "text", "Some text.", "- None found", spell_check)
+        return " ".join(message['content'] for message in completion.call_args.kwargs['messages'])
+
+    def test_llm_checks_spelling_when_no_dictionary_is_available(self):
+        self.assertIn("SPELLING:", self.prompts(spell_check=False))
+        self.assertIn("but spelling is not", self.prompts(spell_check=False))
+        self.assertNotIn("SPELLING:", self.prompts(spell_check=True))
+
+
+class RevisionMatchingTests(TestCase):
+    paragraphs = [f"Paragraph {i} of the report." for i in range(10)]
+
+    def digests(self, paragraphs):
+        return [paragraph_digest(paragraph) for paragraph in paragraphs]
+
+    def setUp(self):
+        save_revision('session-a', 'report.txt', self.digests(self.paragraphs), "<p>report</p>", [], {})
+
+    def test_revision_is_matched_by_name_within_a_session(self):
+        revised = self.paragraphs[:8] + ["A new ending.", "Another new paragraph."]
+        self.assertIsNotNone(find_previous_revision('session-a', 'report.txt', self.digests(revised)))
+        self.assertIsNotNone(find_previous_revision('session-a', 'renamed.txt', self.digests(revised)))
+
+    def test_other_sessions_never_match(self):
+        self.assertIsNone(find_previous_revision('session-b', 'report.txt', self.digests(self.paragraphs)))
+
+    def test_same_name_with_unrelated_content_does_not_match(self):
+        unrelated = [f"Unrelated text {i}." for i in range(10)]
+        self.assertIsNone(find_previous_revision('session-a', 'report.txt', self.digests(unrelated)))
+
+    def test_proofreader_keys_revisions_on_the_session(self):
+        with override_settings(ADMISSION_CONTROL={'ENABLED': False}), \
+                mock.patch('model.views.handle_uploaded_file', return_value={'path': 'p', 'upload': 'u'}), \
+                mock.patch('model.views.unpin_upload'), \
+                mock.patch('model.views.proofread_document', return_value="ok") as proofread:
+            self.client.post(reverse('proofread_myne'), {'file': SimpleUploadedFile('report.txt', b"text")})
+            self.client.post(reverse('proofread_myne'), {'file': SimpleUploadedFile('report.txt', b"text")})
+            first, second = [call.kwargs['client_id'] for call in proofread.call_args_list]
+            self.assertEqual(first, second)
+
+            self.client.cookies.clear()
+            self.client.post(reverse('proofread_myne'), {'file': SimpleUploadedFile('report.txt', b"text")})
+            self.assertNotEqual(proofread.call_args.kwargs['client_id'], first)
+
+
+class IncrementalProofreadTests(TestCase):
+    paragraphs = [f"Paragraph {i} describes the quarterly results of the team." for i in range(10)]
+
+    def proofread(self, paragraphs):
+        text = "\n\n".join(paragraphs)
+        profile = {'document_type': "text", 'text': text, 'readability': readability_stats(text)}
+        prompts = []
+
+        def completion(client, messages, **kwargs):
+            prompt = messages[-1]['content']
+            prompts.append(prompt)
+            numbers = re.findall(r'\[\[PARAGRAPH (\d+)\]\]\n', prompt)
+            if not numbers:
+                return "<p>Full review.</p>"
+            return "".join(f"[[PARAGRAPH {number}]]\n<p>Review of {number}.</p>" for number in numbers)
+
+        with mock.patch.object(proofreader, 'get_groq_client'), \
+                mock.patch.object(proofreader, 'get_document_profile', return_value=profile), \
+                mock.patch.object(proofreader, 'create_chat_completion', side_effect=completion):
+            result = proofreader.proofread_document('uploads/report.txt', 'session-a', 'report.txt')
+        return result, prompts
+
+    def revise(self, changes):
+        return [changes.get(i, paragraph) for i, paragraph in enumerate(self.paragraphs)]
+
+    def test_identical_reupload_makes_no_llm_calls(self):
+        self.proofread(self.paragraphs)
+        result, prompts = self.proofread(self.paragraphs)
+        self.assertEqual(prompts, [])
+        self.assertIn("0 of 10 paragraphs changed", result)
+        self.assertIn("<p>Full review.</p>", result)
+
+    def test_only_changed_paragraphs_are_reviewed_again(self):
+        self.proofread(self.paragraphs)
+        result, prompts = self.proofread(self.revise({2: "A rewritten third paragraph."}))
+        self.assertEqual(len(prompts), 1)
+        self.assertIn("A rewritten third paragraph.", prompts[0])
+        self.assertNotIn(self.paragraphs[0], prompts[0])
+        self.assertIn("Paragraph 3 (changed)", result)
+        self.assertIn("<p>Review of 3.</p>", result)
+
+        # Findings of earlier revisions are carried over to the next one
+        result, prompts = self.proofread(self.revise({2: "A rewritten third paragraph.", 5: "A new sixth paragraph."}))
+        self.assertEqual(len(prompts), 1)
+        self.assertNotIn("A rewritten third paragraph.", prompts[0])
+        self.assertIn("Paragraph 3 (reviewed in an earlier revision)", result)
+        self.assertIn("Paragraph 6 (changed)", result)
+
+    def test_revisions_changing_most_paragraphs_are_proofread_in_full(self):
+        self.proofread(self.paragraphs)
+        result, prompts = self.proofread(self.revise({i: f"New paragraph {i}." for i in range(6)}))
+        self.assertEqual(len(prompts), 1)
+        self.assertIn("ENHANCED VERSION", prompts[0])
+        self.assertNotIn("Revision Review", result)
+
+    def test_large_changed_text_is_proofread_in_full(self):
+        self.proofread(self.paragraphs)
+        with mock.patch.object(proofreader, 'MAX_CHANGED_CHARACTERS', 10):
+            result, prompts = self.proofread(self.revise({2: "A rewritten third paragraph."}))
+        self.assertIn("ENHANCED VERSION", prompts[0])
+        self.assertNotIn("Revision Review", result)
+
+    def test_reviews_are_split_on_paragraph_markers(self):
+        response = "Preamble.\n[[PARAGRAPH 2]]\n<p>Two.</p>\n[[PARAGRAPH 9]]\n<p>Not asked.</p>[[PARAGRAPH 4]]<p>Four.</p>"
+        self.assertEqual(parse_paragraph_reviews(response, {1, 3}), {1: "<p>Two.</p>", 3: "<p>Four.</p>"})
+
+    def test_old_revisions_are_pruned_on_save(self):
+        save_revision('session-b', 'old.txt', ["digest"], "<p>old</p>", ["digest"], {})
+        ProofreadRevision.objects.update(created_at=timezone.now() - timedelta(days=30))
+        self.proofread(self.paragraphs)
+        self.assertEqual(list(ProofreadRevision.objects.values_list('client_key', flat=True)), ['session-a'])
+
+
+class CompressionTests(SimpleTestCase):
+    def test_minify_strips_indentation_but_keeps_paragraph_breaks(self):
+        html = """
+            <div class="rag-result">
+                First paragraph.
+
+                Second paragraph.
+                   
+
+
+                Third paragraph.
+            </div>
+            """
+        self.assertEqual(
+            minify_html(html),
+            '<div class="rag-result">\nFirst paragraph.\n\nSecond paragraph.\n\nThird paragraph.\n</div>'
+        )
+
+    def test_minify_leaves_preformatted_blocks_alone(self):
+        html = "<div>\n    <pre>  keep\n\n\n    this</pre>\n</div>"
+        self.assertEqual(minify_html(html), "<div>\n<pre>  keep\n\n\n    this</pre>\n</div>")
+
+    def test_responses_are_gzipped_when_accepted(self):
+        middleware = CompressionMiddleware(lambda request: HttpResponse("<p>text</p>" * 100))
+        middleware.brotli_available = False
+        response = middleware(RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), b"<p>text</p>" * 100)
+
+    def test_brotli_accepted_unless_q_is_zero(self):
+        self.assertTrue(accepts_brotli('gzip, deflate, br'))
+        self.assertTrue(accepts_brotli('gzip;q=1.0, br;q=0.5'))
+        self.assertTrue(accepts_brotli('BR ; q=0.9'))
+        self.assertFalse(accepts_brotli('gzip, br;q=0'))
+        self.assertFalse(accepts_brotli('br;q=0.000'))
+        self.assertFalse(accepts_brotli('gzip, brotli'))
+        self.assertFalse(accepts_brotli(''))
+
+
+# Stands in for the optional brotli package, using zlib so the output can be checked
+class FakeBrotliCompressor:
+    def __init__(self, quality):
+        self.compressor = zlib.compressobj()
+
+    def process(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+fake_brotli = SimpleNamespace(compress=lambda data, quality: zlib.compress(data), Compressor=FakeBrotliCompressor)
+
+
+@mock.patch.dict('sys.modules', brotli=fake_brotli)
+@mock.patch.object(CompressionMiddleware, 'brotli_available', True)
+class BrotliCompressionTests(SimpleTestCase):
+    def test_responses_use_brotli_when_accepted(self):
+        middleware = CompressionMiddleware(lambda request: HttpResponse("<p>text</p>" * 100, headers={'ETag': '"v1"'}))
+        response = middleware(RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip, br;q=0.5'))
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(response['ETag'], 'W/"v1"')
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(zlib.decompress(response.content), b"<p>text</p>" * 100)
+
+    def test_brotli_refused_with_q_zero_falls_back_to_gzip(self):
+        middleware = CompressionMiddleware(lambda request: HttpResponse("<p>text</p>" * 100))
+        response = middleware(RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip, br;q=0'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_streamed_chunks_are_flushed_as_they_arrive(self):
+        chunks = [b"first chunk " * 20, b"second chunk " * 20]
+        middleware = CompressionMiddleware(lambda request: StreamingHttpResponse(iter(chunks)))
+        response = middleware(RequestFactory().get('/', HTTP_ACCEPT_ENCODING='br'))
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertFalse(response.has_header('Content-Length'))
+        decompressor = zlib.decompressobj()
+        stream = iter(response.streaming_content)
+        # Each chunk can be decoded before the next one is produced
+        for chunk in chunks:
+            self.assertEqual(decompressor.decompress(next(stream)), chunk)
+        decompressor.decompress(b"".join(stream))
+        self.assertTrue(decompressor.eof)
+
+
+class WikipediaResponseCacheTests(SimpleTestCase):
+    caches = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'responses': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'wikipedia-tests'},
+    }
+
+    def scrape(self, cache_seconds):
+        page = {'title': 'Example', 'content': '', 'summary': '', 'images': [], 'headings': []}
+        with override_settings(CACHES=self.caches, WIKIPEDIA_RESPONSE_CACHE_SECONDS=cache_seconds,
+                               ADMISSION_CONTROL={'ENABLED': False}), \
+                mock.patch('model.views.scrape_wikipedia', return_value=page) as scrape:
+            for _ in range(2):
+                self.client.post(reverse('scrape_ped'), json.dumps({'url': 'https://en.wikipedia.org/wiki/Example'}),
+                                 content_type='application/json')
+            return scrape.call_count
+
+    def test_refreshes_scrape_again_by_default(self):
+        self.assertEqual(self.scrape(0), 2)
+
+    def test_responses_are_reused_when_enabled(self):
+        self.assertEqual(self.scrape(60), 1)
+
+
+class RecordReplayTests(SimpleTestCase):
+    def setUp(self):
+        self.fixtures = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.fixtures, ignore_errors=True)
+        environ = mock.patch.dict(os.environ)
+        environ.start()
+        self.addCleanup(environ.stop)
+        os.environ.pop('QUADRANEX_IO_MODE', None)
+        os.environ.pop('QUADRANEX_IO_REPLAY_TIMING', None)
+        settings_override = override_settings(IO_FIXTURES_DIR=self.fixtures, IO_REPLAY_TIMING=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def fake_groq(self, content="recorded answer"):
+        completion = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        stream = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+                  for part in ("rec", "orded")]
+
+        def create(**params):
+            return iter(stream) if params.get('stream') else completion
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=mock.Mock(side_effect=create))))
+
+    def test_recorded_calls_replay_without_running(self):
+        with override_settings(IO_MODE='record'):
+            self.assertEqual(replay.recorded('wikipedia', {'url': 'u'}, lambda: {'title': 'T'}), {'title': 'T'})
+        with override_settings(IO_MODE='replay'):
+            self.assertEqual(replay.recorded('wikipedia', {'url': 'u'}, mock.Mock(side_effect=AssertionError)),
+                             {'title': 'T'})
+            with self.assertRaises(replay.ReplayMissError):
+                replay.recorded('wikipedia', {'url': 'other'}, lambda: None)
+
+    def test_groq_completions_and_streams_replay_offline(self):
+        params = {'model': 'llama3-70b-8192', 'messages': [{'role': 'user', 'content': 'hi'}]}
+        with override_settings(IO_MODE='record'):
+            client = replay.RecordingClient(self.fake_groq())
+            self.assertEqual(client.chat.completions.create(**params).choices[0].message.content, "recorded answer")
+            self.assertEqual(len(list(client.chat.completions.create(stream=True, **params))), 2)
+
+        with override_settings(IO_MODE='replay'):
+            client = replay.RecordingClient()
+            self.assertEqual(client.chat.completions.create(**params).choices[0].message.content, "recorded answer")
+            chunks = client.chat.completions.create(stream=True, **params)
+            self.assertEqual("".join(chunk.choices[0].delta.content for chunk in chunks), "recorded")
+            with self.assertRaises(replay.ReplayMissError):
+                client.chat.completions.create(**{**params, 'temperature': 0.1})
+
+    def test_chat_endpoint_replays_without_api_key(self):
+        def ask():
+            return self.client.post(reverse('chat_carmen'), json.dumps({'message': 'What is a hash table?'}),
+                                    content_type='application/json').json()['response']
+
+        with override_settings(ADMISSION_CONTROL={'ENABLED': False}, SINGLE_FLIGHT_CROSS_PROCESS=False):
+            with mock.patch.dict(os.environ, {'QUADRANEX_IO_MODE': 'record', 'GROQ_API_KEY': 'test'}), \
+                    mock.patch('groq.Groq', return_value=self.fake_groq("A hash table maps keys to values.")):
+                recorded_response = ask()
+            with mock.patch.dict(os.environ, {'QUADRANEX_IO_MODE': 'replay'}):
+                os.environ.pop('GROQ_API_KEY', None)
+                self.assertEqual(ask(), recorded_response)
+        self.assertIn("A hash table maps keys to values.", recorded_response)
+
+
+class UploadAdmissionTests(SimpleTestCase):
+    def test_upload_endpoint_is_rate_limited(self):
+        middleware = AdmissionControlMiddleware(lambda request: HttpResponse('ok'))
+        self.assertEqual(middleware.endpoint_class(reverse('document_upload')), 'upload')
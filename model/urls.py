@@ -21,6 +21,7 @@ urlpatterns = [
     path('', views.index, name='index'),                # Root URL for the main page
     path('chat/carmen/', views.chatbot_view, name='chat_carmen'),
     path('rag/sirius/', views.rag_view, name='rag_sirius'),
+    path('documents/upload/', views.document_upload_view, name='document_upload'),
     path('proofread/myne/', views.proofreader_view, name='proofread_myne'),
     path('scrape/ped/', views.wikipedia_view, name='scrape_ped'),
 ]
\ No newline at end of file
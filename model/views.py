@@ -1,20 +1,22 @@
 from django.shortcuts import render
+from django.conf import settings
 from django.http import JsonResponse
+from django.core.cache import caches
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import os
 import json
 import sys
+import hashlib
 # Add the project root directory to the Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-# Now import utils using an absolute import
-from model.utils import (
-    get_chat_response, 
-    process_document_for_rag, 
-    scrape_wikipedia, 
-    proofread_document,
-    handle_uploaded_file
-)
+# Now import the feature modules using absolute imports
+from model.chat import get_chat_response
+from model.rag import process_document_for_rag
+from model.wikipedia import scrape_wikipedia
+from model.proofreader import proofread_document
+from model.documents import handle_uploaded_file
+from model.storage import unpin_upload
 
 def index(request):
     """Main view for the QuadraNex-AI interface"""
@@ -52,12 +54,34 @@ def rag_view(request):
         file_info = handle_uploaded_file(uploaded_file)
         
         # Process the document with RAG - extract the path from the file_info dictionary
-        response = process_document_for_rag(file_info['path'], query)
+        try:
+            response = process_document_for_rag(file_info['path'], query)
+        finally:
+            unpin_upload(file_info['upload'])
         
         return JsonResponse({'response': response})
     except Exception as e:
         return json_error(f'RAG processing error: {str(e)}', status=500)
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def document_upload_view(request):
+    # Store a document ahead of the questions about it, so its profile is built while the user types
+    try:
+        uploaded_file = request.FILES.get('file')
+        
+        if not uploaded_file:
+            return json_error('Document is required')
+        
+        file_info = handle_uploaded_file(uploaded_file)
+        unpin_upload(file_info['upload'])
+        if 'error' in file_info:
+            return json_error(file_info['error'])
+        
+        return JsonResponse({'response': 'Document uploaded'})
+    except Exception as e:
+        return json_error(f'Upload error: {str(e)}', status=500)
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def wikipedia_view(request):
@@ -71,18 +95,28 @@ def wikipedia_view(request):
         if 'wikipedia.org' not in article_url:
             return json_error('Not a valid Wikipedia URL')
         
-        result = scrape_wikipedia(article_url)
-        
-        if 'error' in result:
-            return json_error(result['error'], status=500)
+        # Optionally reuse recent scrapes, kept compressed on disk; off by default so refreshes see edits
+        cache_seconds = getattr(settings, 'WIKIPEDIA_RESPONSE_CACHE_SECONDS', 0)
+        cache_key = 'wikipedia:' + hashlib.sha256(article_url.encode('utf-8')).hexdigest()
+        response_cache = caches['responses']
+        payload = response_cache.get(cache_key) if cache_seconds else None
+        if payload is None:
+            result = scrape_wikipedia(article_url)
+            
+            if 'error' in result:
+                return json_error(result['error'], status=500)
+            
+            payload = {
+                'title': result['title'],
+                'content': result['content'],
+                'summary': result.get('summary', ''),
+                'images': result.get('images', []),
+                'headings': result.get('headings', [])
+            }
+            if cache_seconds:
+                response_cache.set(cache_key, payload, cache_seconds)
         
-        return JsonResponse({
-            'title': result['title'],
-            'content': result['content'],
-            'summary': result.get('summary', ''),
-            'images': result.get('images', []),
-            'headings': result.get('headings', [])
-        })
+        return JsonResponse(payload)
     except Exception as e:
         return json_error(f'Wikipedia error: {str(e)}', status=500)
 
@@ -95,8 +129,19 @@ def proofreader_view(request):
         if not uploaded_file:
             return json_error('Document is required')
         
+        # Revisions are matched within one browser session, never across users sharing an address
+        if request.session.session_key is None:
+            request.session.save()
+        
         file_info = handle_uploaded_file(uploaded_file)
-        result = proofread_document(file_info['path'])
+        try:
+            result = proofread_document(
+                file_info['path'],
+                client_id=request.session.session_key,
+                filename=uploaded_file.name
+            )
+        finally:
+            unpin_upload(file_info['upload'])
         
         return JsonResponse({'response': result if result else 'Document proofread successfully', 'error': ''})
     except Exception as e:
@@ -0,0 +1,286 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from model.compression import minify_html
+from model.profiles import split_chunks
+from model.replay import recorded
+from model.llm import get_groq_client, create_chat_completion
+
+# Wikipedia summary helpers
+SUMMARY_DIRECT_LIMIT = 5000  # Articles up to this length are summarised in a single call
+SECTION_TEXT_LIMIT = 6000  # Longer sections are split into parts summarised separately
+SECTION_MIN_LENGTH = 300  # Shorter sections are passed to the final summary verbatim
+REDUCE_INPUT_LIMIT = 12000  # Characters of section summaries per prompt, well inside the model's context
+
+
+def _summary_completion(client, prompt, max_tokens):
+    return create_chat_completion(
+        client,
+        messages=[
+            {"role": "system", "content": "You are a helpful assistant that summarizes Wikipedia articles."},
+            {"role": "user", "content": prompt}
+        ],
+        model="llama3-70b-8192",
+        temperature=0.3,
+        max_tokens=max_tokens
+    )
+
+
+def _summarize_section(client, article_title, section):
+    section_prompt = f"""
+    Summarize the "{section['title']}" section of the Wikipedia article about {article_title}.
+    Use one short plain-text paragraph that keeps the key facts, names, dates and figures.
+    
+    Section content:
+    {section['text']}
+    """
+    return _summary_completion(client, section_prompt, 200)
+
+
+def _combine_summaries(client, article_title, group):
+    first_title, last_title = group[0][0], group[-1][0]
+    combined = "\n\n".join(f"{title}:\n{summary}" for title, summary in group)
+    combine_prompt = f"""
+    Combine these summaries of consecutive sections of the Wikipedia article about {article_title}
+    into one plain-text paragraph that keeps the key facts, names, dates and figures.
+    
+    Section summaries:
+    {combined}
+    """
+    return (f"{first_title} to {last_title}", _summary_completion(client, combine_prompt, 400))
+
+
+def group_summaries(entries, limit=REDUCE_INPUT_LIMIT):
+    """Split (title, summary) entries into consecutive groups of at most limit characters."""
+    groups = []
+    size = 0
+    for title, summary in entries:
+        entry = (title, summary[:limit - len(title) - 4])
+        entry_size = len(entry[0]) + len(entry[1]) + 4
+        if groups and size + entry_size <= limit:
+            groups[-1].append(entry)
+            size += entry_size
+        else:
+            groups.append([entry])
+            size = entry_size
+    return groups
+
+
+def split_sections(sections):
+    """Drop empty sections and split those over SECTION_TEXT_LIMIT into parts on paragraph boundaries."""
+    parts = []
+    for section in sections:
+        text = section["text"].strip()
+        if not text:
+            continue
+        chunks = split_chunks(text, SECTION_TEXT_LIMIT)
+        for number, (start, end) in enumerate(chunks, 1):
+            suffix = f" (part {number})" if len(chunks) > 1 else ""
+            parts.append({"title": section["title"][:255 - len(suffix)] + suffix, "text": text[start:end]})
+    return parts
+
+
+def summarize_wikipedia_article(article_url, article_title, article_content, sections, revision_id=None):
+    """Summarise an article, reducing cached per-section summaries for long articles.
+    
+    Section summaries are cached per (article, section, content hash) together with the
+    revision they were produced from, so a refresh only re-summarises sections whose
+    text changed since the last visit.
+    """
+    from model.models import WikipediaSectionSummary
+    
+    client = get_groq_client()
+    
+    # Short articles fit in a single prompt
+    if len(article_content) <= SUMMARY_DIRECT_LIMIT:
+        summary_prompt = f"""
+        Please provide a concise summary of this Wikipedia article about {article_title}.
+        The summary should be about 3-4 paragraphs and highlight the most important information.
+        Format the summary with HTML for better readability.
+        
+        Article content:
+        {article_content}
+        """
+        return _summary_completion(client, summary_prompt, 500)
+    
+    sections = split_sections(sections)
+    for section in sections:
+        section["hash"] = hashlib.sha256(section["text"].encode("utf-8")).hexdigest()
+    
+    # Look up every cached section summary with a single query
+    cached = {
+        (row.section_title, row.content_hash): row.summary
+        for row in WikipediaSectionSummary.objects.filter(
+            article_url=article_url,
+            content_hash__in=[section["hash"] for section in sections]
+        )
+    }
+    
+    pending = [
+        section for section in sections
+        if len(section["text"]) >= SECTION_MIN_LENGTH and (section["title"], section["hash"]) not in cached
+    ]
+    
+    # Summarise changed sections concurrently
+    max_workers = getattr(settings, 'WIKIPEDIA_SUMMARY_MAX_WORKERS', 4)
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+            futures = [
+                executor.submit(_summarize_section, client, article_title, section) for section in pending
+            ]
+        summaries = []
+        errors = []
+        for section, future in zip(pending, futures):
+            try:
+                summaries.append((section, future.result()))
+            except Exception as e:
+                errors.append(e)
+        
+        # Keep every summary that succeeded so a retry only redoes the failed sections.
+        # A concurrent refresh of the same article may store the same sections first; keep its rows
+        WikipediaSectionSummary.objects.bulk_create([
+            WikipediaSectionSummary(
+                article_url=article_url,
+                section_title=section["title"],
+                content_hash=section["hash"],
+                summary=section_summary,
+                revision_id=revision_id
+            )
+            for section, section_summary in summaries
+        ], ignore_conflicts=True)
+        if errors:
+            raise errors[0]
+        for section, section_summary in summaries:
+            cached[(section["title"], section["hash"])] = section_summary
+    
+    # Drop summaries of sections that no longer exist in this revision
+    WikipediaSectionSummary.objects.filter(article_url=article_url).exclude(
+        content_hash__in=[section["hash"] for section in sections]
+    ).delete()
+    
+    entries = [
+        (section['title'], cached.get((section['title'], section['hash']), section['text'].strip()))
+        for section in sections
+    ]
+    
+    # Articles with many sections are reduced in levels until the summaries fit in one prompt
+    groups = group_summaries(entries)
+    while len(groups) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as executor:
+            entries = list(executor.map(lambda group: _combine_summaries(client, article_title, group), groups))
+        groups = group_summaries(entries)
+    
+    section_digest = "\n\n".join(f"{title}:\n{summary}" for title, summary in groups[0]) if groups else ""
+    
+    reduce_prompt = f"""
+    Please provide a concise summary of the Wikipedia article about {article_title}.
+    Below are summaries of each section of the article, in order.
+    The summary should be about 3-4 paragraphs and highlight the most important information.
+    Format the summary with HTML for better readability.
+    
+    Section summaries:
+    {section_digest}
+    """
+    return _summary_completion(client, reduce_prompt, 500)
+
+# Load a Wikipedia article and extract its parts; recorded or replayed in those IO modes
+def fetch_wikipedia_page(article_url):
+    return recorded('wikipedia', {'url': article_url}, lambda: _load_wikipedia_page(article_url))
+
+
+# Load a Wikipedia article in headless Chrome
+def _load_wikipedia_page(article_url):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+    
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    
+    # Setup Chrome WebDriver
+    driver = webdriver.Chrome(
+        service=Service(ChromeDriverManager().install()),
+        options=chrome_options
+    )
+    
+    try:
+        # Navigate to Wikipedia article
+        driver.get(article_url)
+        
+        # Extract article title
+        article_title = driver.find_element(By.ID, "firstHeading").text
+        
+        # Extract article content
+        article_content = driver.find_element(By.ID, "bodyContent").text
+        
+        # Extract images
+        image_elements = driver.find_elements(By.CSS_SELECTOR, ".image img")
+        image_urls = [img.get_attribute("src") for img in image_elements[:5]]  # Limit to 5 images
+        
+        # Extract headings
+        heading_elements = driver.find_elements(By.CSS_SELECTOR, "#bodyContent h2, #bodyContent h3")
+        headings = [heading.text.replace("[edit]", "").strip() for heading in heading_elements]
+        
+        # Extract the revision id so cached section summaries can be traced to a revision
+        try:
+            revision_id = driver.execute_script("return mw.config.get('wgCurRevisionId');")
+        except Exception:
+            revision_id = None
+        
+        # Format content with headings as sections, collecting plain text per section.
+        # Article markup sits in .mw-parser-output; headings are wrapped in div.mw-heading
+        formatted_content = ""
+        article_sections = [{"title": "Introduction", "text": ""}]
+        content_sections = driver.find_elements(By.CSS_SELECTOR, "#mw-content-text > .mw-parser-output > *") or \
+            driver.find_elements(By.CSS_SELECTOR, "#bodyContent > *")
+        for section in content_sections:
+            classes = (section.get_attribute("class") or "").split()
+            if section.tag_name in ["h2", "h3", "h4"] or "mw-heading" in classes:
+                heading = section if section.tag_name in ["h2", "h3", "h4"] else \
+                    section.find_element(By.CSS_SELECTOR, "h2, h3, h4")
+                section_title = heading.text.replace("[edit]", "").strip()
+                section_id = section_title.lower().replace(" ", "-")
+                formatted_content += f'<h3 id="section-{section_id}">{section_title}</h3>\n'
+                article_sections.append({"title": section_title, "text": ""})
+            elif section.tag_name in ["p", "ul", "ol", "div"]:
+                formatted_content += f'<div class="wiki-section-content">{section.get_attribute("innerHTML")}</div>\n'
+                article_sections[-1]["text"] += section.text + "\n"
+        
+        return {
+            "title": article_title,
+            "text": article_content,
+            "content": minify_html(formatted_content),
+            "sections": article_sections,
+            "images": image_urls,
+            "headings": headings,
+            "revision_id": revision_id
+        }
+    finally:
+        driver.quit()
+
+# Wikipedia Scraper utility
+def scrape_wikipedia(article_url):
+    try:
+        page = fetch_wikipedia_page(article_url)
+        
+        # Generate a summary using Groq API
+        try:
+            summary = summarize_wikipedia_article(
+                article_url, page["title"], page["text"], page["sections"], page["revision_id"]
+            )
+        except Exception as e:
+            summary = f"<p>Error generating summary: {str(e)}</p>"
+        
+        return {
+            "title": page["title"],
+            "content": page["content"],
+            "summary": summary,
+            "images": page["images"],
+            "headings": page["headings"]
+        }
+    except Exception as e:
+        return {"error": str(e)}
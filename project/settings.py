@@ -52,6 +52,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'model.compression.CompressionMiddleware',
+    'model.middleware.AdmissionControlMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -133,3 +135,112 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Wikipedia summariser: number of section summaries generated concurrently
+WIKIPEDIA_SUMMARY_MAX_WORKERS = 4
+
+# Upload storage lifecycle (see `python manage.py gc_uploads`)
+UPLOAD_QUOTA_BYTES = 500 * 1024 * 1024  # Total size kept in media/uploads
+UPLOAD_MAX_AGE_SECONDS = 7 * 24 * 60 * 60  # Unpinned uploads idle this long are deleted
+UPLOAD_GC_INTERVAL_SECONDS = 0  # Set above 0 to run GC in a background thread of each worker
+UPLOAD_PIN_TIMEOUT_SECONDS = 60 * 60  # Pins left by workers that died mid-request expire after this
+
+# Heavy backends (groq, selenium, docx, ...) are imported on first use.
+# Set to True, or to a list of module names, to import them when a worker starts.
+PRELOAD_BACKENDS = False
+
+# Identical in-flight LLM requests share one upstream call within a worker.
+# Enable cross-process coalescing to also share calls between workers via file locks.
+SINGLE_FLIGHT_CROSS_PROCESS = False
+SINGLE_FLIGHT_DIR = BASE_DIR / 'cache' / 'singleflight'
+SINGLE_FLIGHT_LOCK_TIMEOUT = 120  # Seconds a worker waits for another worker's identical call
+
+# Per-client rate limits and fair scheduling for the LLM endpoints.
+# Interactive chat gets a larger share of slots than long document jobs.
+# Limits are kept in each worker's memory: with N worker processes a client may
+# make N times the rate, and up to N * TOTAL_CONCURRENCY requests run at once.
+ADMISSION_CONTROL = {
+    'ENABLED': True,
+    'TOTAL_CONCURRENCY': 8,  # Requests running at once across all classes
+    'TRUST_X_FORWARDED_FOR': False,  # Enable only behind a trusted reverse proxy
+    'CLASSES': {
+        'interactive': {
+            'paths': ['/chat/'],
+            'rate': 1.0,
+            'burst': 10,
+            'concurrency': 6,
+            'weight': 4,
+            'max_queue': 32,
+            'max_wait': 10,
+        },
+        'document': {
+            'paths': ['/rag/', '/proofread/'],
+            'rate': 0.1,
+            'burst': 3,
+            'concurrency': 2,
+            'weight': 1,
+            'max_queue': 8,
+            'max_wait': 30,
+            'retry_after': 15,
+        },
+        'scrape': {
+            'paths': ['/scrape/'],
+            'rate': 0.2,
+            'burst': 5,
+            'concurrency': 2,
+            'weight': 1,
+            'max_queue': 8,
+            'max_wait': 30,
+            'retry_after': 15,
+        },
+        # Uploads ahead of a query; each one starts background text extraction and profiling
+        'upload': {
+            'paths': ['/documents/'],
+            'rate': 0.1,
+            'burst': 3,
+            'concurrency': 2,
+            'weight': 1,
+            'max_queue': 8,
+            'max_wait': 30,
+            'retry_after': 15,
+        },
+    },
+}
+
+# Background threads per worker that precompute document profiles after upload
+DOCUMENT_PROFILE_WORKERS = 2
+
+# Word list (one word per line) for the proofreader's local spell check.
+# The bundled US English list is derived from pyspellchecker's (MIT, see model/data/words-LICENSE.txt)
+PROOFREADER_DICTIONARY_PATH = BASE_DIR / 'model' / 'data' / 'words.txt'
+
+# Re-proofread only the changed paragraphs when a browser session uploads a new revision of a document
+PROOFREADER_REVISION_MODE = True
+PROOFREADER_REVISION_MAX_AGE_SECONDS = 14 * 24 * 60 * 60  # Revisions older than this are deleted
+
+# Responses are compressed with brotli when the optional `brotli` package is installed
+# and the client accepts it, otherwise with gzip
+BROTLI_QUALITY = 5
+
+# Caches; FileBasedCache stores entries zlib-compressed on disk
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'responses',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+# Seconds a scraped Wikipedia response is reused; 0 disables the cache.
+# While an article is cached, refreshing it returns the cached summary and edits
+# are not picked up, so keep this short (e.g. 60) when enabling it under load.
+WIKIPEDIA_RESPONSE_CACHE_SECONDS = 0
+
+# Groq and Wikipedia I/O: 'live', 'record' (live, saving fixtures) or 'replay' (offline from fixtures).
+# The QUADRANEX_IO_MODE environment variable overrides this.
+IO_MODE = 'live'
+IO_FIXTURES_DIR = BASE_DIR / 'fixtures' / 'io'
+IO_REPLAY_TIMING = False  # Sleep for the recorded latency when replaying